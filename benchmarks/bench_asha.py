@@ -0,0 +1,104 @@
+"""
+Benchmark do ASHA Nativo vs Optuna + HyperbandPruner
+Mesmo orçamento de tempo: configurações exploradas, épocas treinadas e melhor MSE
+
+No HyperbandPruner uma configuração podada é descartada e cada trial treina
+do zero; no ASHAScheduler as configurações promovidas retomam o treino do
+degrau anterior (modelo e otimizador preservados).
+
+Uso:
+    python benchmarks/bench_asha.py --timeout 120 --max-epochs 90
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import optuna
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src.dataset import load_boston_data
+from src.tuning import ASHAScheduler, KFoldObjective, make_pruner
+
+
+def run_hyperband(objective: KFoldObjective, timeout: float, seed: int) -> dict:
+    study = optuna.create_study(
+        direction='minimize',
+        sampler=optuna.samplers.TPESampler(seed=seed),
+        pruner=make_pruner(**objective.pruner_kwargs())
+    )
+    start = time.perf_counter()
+    study.optimize(objective, timeout=timeout)
+    elapsed = time.perf_counter() - start
+
+    epochs = 0
+    for trial in study.trials:
+        if 'fold_epochs' in trial.user_attrs:
+            epochs += sum(trial.user_attrs['fold_epochs'])
+        elif trial.intermediate_values:
+            epochs += len(trial.intermediate_values)
+    complete = study.get_trials(deepcopy=False, states=(optuna.trial.TrialState.COMPLETE,))
+    return {
+        'configs': len(study.trials),
+        'full': len(complete),
+        'epochs': epochs,
+        'best': study.best_value if complete else float('nan'),
+        'time': elapsed
+    }
+
+
+def run_asha(objective: KFoldObjective, timeout: float, min_epochs: int, seed: int) -> dict:
+    scheduler = ASHAScheduler(
+        objective, min_epochs=min_epochs, sampler=optuna.samplers.TPESampler(seed=seed)
+    )
+    start = time.perf_counter()
+    results = scheduler.run(timeout=timeout)
+    elapsed = time.perf_counter() - start
+    top_rung = len(scheduler.rungs) - 1
+    full = [r for r in results if r['rung'] == top_rung]
+    return {
+        'configs': len(results),
+        'full': len(full),
+        'epochs': scheduler.epochs_trained,
+        'best': full[0]['score'] if full else float('nan'),
+        'time': elapsed
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--timeout', type=float, default=120.0)
+    parser.add_argument('--k-folds', type=int, default=3)
+    parser.add_argument('--max-epochs', type=int, default=90)
+    parser.add_argument('--min-epochs', type=int, default=10)
+    parser.add_argument('--patience', type=int, default=15)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+    df = load_boston_data()
+    X = df.drop('MEDV', axis=1).values
+    y = df['MEDV'].values
+
+    def make_objective() -> KFoldObjective:
+        return KFoldObjective(
+            X, y, n_splits=args.k_folds, seed=args.seed,
+            max_epochs=args.max_epochs, patience=args.patience
+        )
+
+    rows = {
+        'Optuna + Hyperband': run_hyperband(make_objective(), args.timeout, args.seed),
+        'ASHA nativo': run_asha(make_objective(), args.timeout, args.min_epochs, args.seed),
+    }
+
+    print(f"\n{'modo':>18} | {'tempo (s)':>9} | {'configurações':>13} | {'completas':>9} | "
+          f"{'épocas':>6} | {'melhor MSE':>10}")
+    print("-" * 82)
+    for name, r in rows.items():
+        print(f"{name:>18} | {r['time']:>9.1f} | {r['configs']:>13d} | {r['full']:>9d} | "
+              f"{r['epochs']:>6d} | {r['best']:>10.4f}")
+
+
+if __name__ == '__main__':
+    main()
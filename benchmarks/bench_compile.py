@@ -0,0 +1,98 @@
+"""
+Benchmark do Modo Compilado do MLP: eager vs TorchScript vs torch.compile
+Mede tempo de compilação (1º modelo e 2º modelo com a mesma arquitetura),
+épocas/segundo de treino e latência de inferência de uma amostra
+
+Uso:
+    python benchmarks/bench_compile.py --epochs 30 --threads 1
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import torch
+import torch.nn as nn
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src.dataset import load_boston_data, get_kfold_splits, make_fold_loaders
+from src.model import MLP, compile_model
+from src.train import train_epoch, validate_epoch
+
+
+def make_model(seed: int) -> MLP:
+    torch.manual_seed(seed)
+    return MLP(input_dim=13, hidden_dims=[64, 32], dropout_rate=0.3, use_batch_norm=True)
+
+
+def measure(fold: dict, backend: str, epochs: int) -> dict:
+    device = torch.device('cpu')
+    criterion = nn.MSELoss()
+
+    model = make_model(42)
+    start = time.perf_counter()
+    used = compile_model(model, backend)
+    t_compile = time.perf_counter() - start
+
+    # Mesma assinatura: deve reaproveitar o artefato do cache
+    start = time.perf_counter()
+    compile_model(make_model(43), backend)
+    t_recompile = time.perf_counter() - start
+
+    train_loader, val_loader = make_fold_loaders(
+        fold, 16, drop_last=True, generator=torch.Generator().manual_seed(42)
+    )
+    optimizer = torch.optim.Adam(model.parameters(), lr=1e-3, weight_decay=1e-4)
+
+    # Aquecimento (formas de batch ainda não vistas pelo compilador)
+    train_epoch(model, train_loader, criterion, optimizer, device)
+    validate_epoch(model, val_loader, criterion, device)
+
+    start = time.perf_counter()
+    for _ in range(epochs):
+        train_epoch(model, train_loader, criterion, optimizer, device)
+        val_loss = validate_epoch(model, val_loader, criterion, device)
+    eps = epochs / (time.perf_counter() - start)
+
+    # Inferência de uma amostra (caso do app Streamlit)
+    model.eval()
+    x = fold['X_val'][:1].float()
+    with torch.no_grad():
+        for _ in range(20):
+            model(x)
+        start = time.perf_counter()
+        for _ in range(1000):
+            model(x)
+    latency_us = (time.perf_counter() - start) / 1000 * 1e6
+
+    return {'backend': used, 'compile': t_compile, 'recompile': t_recompile,
+            'eps': eps, 'latency': latency_us, 'val_loss': val_loss}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--epochs', type=int, default=30)
+    parser.add_argument('--threads', type=int, default=None, help='torch.set_num_threads (opcional)')
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    df = load_boston_data()
+    X = df.drop('MEDV', axis=1).values
+    y = df['MEDV'].values
+    fold = get_kfold_splits(X, y, n_splits=5, seed=42)[0]
+
+    print(f"{'backend':>8} | {'compilação (s)':>14} | {'2º modelo (s)':>13} | {'épocas/s':>8} | {'inferência (µs)':>15}")
+    print("-" * 72)
+    baseline = None
+    for backend in ('eager', 'script', 'compile'):
+        r = measure(fold, backend, args.epochs)
+        baseline = r['eps'] if baseline is None else baseline
+        print(f"{r['backend']:>8} | {r['compile']:>14.2f} | {r['recompile']:>13.3f} | "
+              f"{r['eps']:>8.1f} | {r['latency']:>15.1f}   ({r['eps'] / baseline:.2f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark do Treinamento Vetorizado do K-Fold
+Compara K treinos sequenciais (FastTensorLoader) com train_folds_fused
+
+Uso:
+    python benchmarks/bench_fused.py --k-folds 5 --max-epochs 100
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import torch
+import torch.nn as nn
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src.dataset import load_boston_data, get_kfold_splits, make_fold_loaders
+from src.fused import train_folds_fused
+from src.model import MLP
+from src.train import train_epoch, validate_epoch, EarlyStopping
+
+
+def train_folds_sequential(folds, config: dict) -> list:
+    """Caminho sequencial com a mesma convenção de seeds de train_folds_fused"""
+    device = torch.device('cpu')
+    criterion = nn.MSELoss()
+    results = []
+    for fold in folds:
+        torch.manual_seed(config['seed'] + fold['fold'])
+        model = MLP(
+            input_dim=13, hidden_dims=config['hidden_dims'],
+            dropout_rate=config['dropout_rate'], use_batch_norm=config['use_batch_norm']
+        )
+        train_loader, val_loader = make_fold_loaders(
+            fold, config['batch_size'], drop_last=config['use_batch_norm'],
+            generator=torch.Generator().manual_seed(config['seed'] + fold['fold'])
+        )
+        optimizer = getattr(torch.optim, config['optimizer_name'])(
+            model.parameters(), lr=config['learning_rate'], weight_decay=config['weight_decay']
+        )
+        early_stopping = EarlyStopping(patience=config['patience'])
+        best_val, best_state = float('inf'), None
+        for _ in range(config['max_epochs']):
+            train_epoch(model, train_loader, criterion, optimizer, device)
+            val_loss = validate_epoch(model, val_loader, criterion, device)
+            if val_loss < best_val:
+                best_val = val_loss
+                best_state = {k: v.detach().clone() for k, v in model.state_dict().items()}
+            if early_stopping(val_loss):
+                break
+        results.append({'best_val_loss': best_val, 'state_dict': best_state})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--k-folds', type=int, default=5)
+    parser.add_argument('--max-epochs', type=int, default=100)
+    parser.add_argument('--patience', type=int, default=15)
+    parser.add_argument('--batch-size', type=int, default=16)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    df = load_boston_data()
+    X = df.drop('MEDV', axis=1).values
+    y = df['MEDV'].values
+    folds = get_kfold_splits(X, y, n_splits=args.k_folds, seed=args.seed)
+
+    # Sem dropout: os dois caminhos devem gerar os mesmos pesos
+    config = {
+        'hidden_dims': [64, 32], 'dropout_rate': 0.0, 'use_batch_norm': False,
+        'optimizer_name': 'Adam', 'learning_rate': 1e-3, 'weight_decay': 1e-4,
+        'batch_size': args.batch_size, 'max_epochs': args.max_epochs,
+        'patience': args.patience, 'seed': args.seed
+    }
+
+    start = time.perf_counter()
+    sequential = train_folds_sequential(folds, config)
+    t_sequential = time.perf_counter() - start
+
+    start = time.perf_counter()
+    fused = train_folds_fused(folds, **config)
+    t_fused = time.perf_counter() - start
+
+    print(f"{'fold':>5} | {'val seq':>9} | {'val fused':>9} | {'max |Δ peso|':>12}")
+    print("-" * 45)
+    for fold, seq, fus in zip(folds, sequential, fused):
+        max_diff = max(
+            (seq['state_dict'][k].float() - fus['state_dict'][k].float()).abs().max().item()
+            for k in seq['state_dict']
+        )
+        print(f"{fold['fold']:>5} | {seq['best_val_loss']:>9.4f} | {fus['best_val_loss']:>9.4f} | {max_diff:>12.2e}")
+
+    print(f"\n🐢 Sequencial: {t_sequential:.2f} s")
+    print(f"⚡ Vetorizado: {t_fused:.2f} s")
+    print(f"📈 Speedup:    {t_sequential / t_fused:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+Benchmark do Modo Full-Batch L-BFGS vs Adam em mini-batches
+Compara tempo total e MSE do K-Fold (run_kfold) nos dois modos de treino
+
+Uso:
+    python benchmarks/bench_lbfgs.py --k-folds 5 --max-epochs 500
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src.dataset import load_boston_data
+from src.train import run_kfold
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--k-folds', type=int, default=5)
+    parser.add_argument('--max-epochs', type=int, default=500)
+    parser.add_argument('--patience', type=int, default=20)
+    parser.add_argument('--dropout', type=float, default=0.3)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    df = load_boston_data()
+    X = df.drop('MEDV', axis=1).values
+    y = df['MEDV'].values
+
+    base = {
+        'k_folds': args.k_folds, 'max_epochs': args.max_epochs, 'patience': args.patience,
+        'dropout_rate': args.dropout, 'seed': args.seed
+    }
+    modes = {
+        'Adam (batch 8)': {'optimizer': 'Adam', 'learning_rate': 1e-3, 'batch_size': 8},
+        'L-BFGS (full-batch)': {'optimizer': 'LBFGS', 'learning_rate': 1.0},
+    }
+
+    print(f"{'modo':>20} | {'tempo (s)':>9} | {'épocas médias':>13} | {'MSE médio':>9} | {'R² médio':>8}")
+    print("-" * 72)
+    for name, overrides in modes.items():
+        start = time.perf_counter()
+        results = run_kfold(X, y, {**base, **overrides})
+        elapsed = time.perf_counter() - start
+        epochs = np.mean([len(r['val_losses']) for r in results])
+        mse = np.mean([r['mse'] for r in results])
+        r2 = np.mean([r['r2'] for r in results])
+        print(f"{name:>20} | {elapsed:>9.2f} | {epochs:>13.1f} | {mse:>9.4f} | {r2:>8.4f}")
+
+
+if __name__ == '__main__':
+    main()
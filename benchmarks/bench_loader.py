@@ -0,0 +1,79 @@
+"""
+Benchmark de Loaders: DataLoader padrão vs FastTensorLoader (normal e residente)
+Mede épocas/segundo de train_epoch + validate_epoch num fold do Boston Housing
+
+Uso:
+    python benchmarks/bench_loader.py --epochs 30
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import torch
+import torch.nn as nn
+from torch.utils.data import DataLoader
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src.dataset import BostonDataset, FastTensorLoader
+from src.model import MLP
+from src.train import train_epoch, validate_epoch
+
+
+def epochs_per_second(make_loaders, epochs: int, device: torch.device) -> float:
+    """Executa épocas completas (treino + validação) e retorna épocas/s"""
+    torch.manual_seed(42)
+    train_loader, val_loader = make_loaders()
+    model = MLP(input_dim=13, hidden_dims=[64, 32], dropout_rate=0.3).to(device)
+    criterion = nn.MSELoss()
+    optimizer = torch.optim.Adam(model.parameters(), lr=1e-3, weight_decay=1e-4)
+
+    # Aquecimento
+    train_epoch(model, train_loader, criterion, optimizer, device)
+
+    start = time.perf_counter()
+    for _ in range(epochs):
+        train_epoch(model, train_loader, criterion, optimizer, device)
+        validate_epoch(model, val_loader, criterion, device)
+    return epochs / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--epochs', type=int, default=30)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[8, 16, 32])
+    args = parser.parse_args()
+
+    device = torch.device('cpu')
+    rng = np.random.default_rng(42)
+    X = rng.normal(size=(506, 13)).astype(np.float32)
+    y = rng.normal(22, 9, size=506).astype(np.float32)
+    train_ds = BostonDataset(X[:404], y[:404])
+    val_ds = BostonDataset(X[404:], y[404:])
+
+    print(f"{'batch':>6} | {'DataLoader':>12} | {'FastTensorLoader':>16} | {'residente':>12} | {'speedup':>7}")
+    print("-" * 67)
+    for bs in args.batch_sizes:
+        baseline = epochs_per_second(
+            lambda: (DataLoader(train_ds, batch_size=bs, shuffle=True),
+                     DataLoader(val_ds, batch_size=bs, shuffle=False)),
+            args.epochs, device
+        )
+        fast = epochs_per_second(
+            lambda: (FastTensorLoader(train_ds, batch_size=bs, shuffle=True),
+                     FastTensorLoader(val_ds, batch_size=bs, shuffle=False)),
+            args.epochs, device
+        )
+        resident = epochs_per_second(
+            lambda: (FastTensorLoader(train_ds, batch_size=bs, shuffle=True, device=device),
+                     FastTensorLoader(val_ds, batch_size=bs, shuffle=False, device=device)),
+            args.epochs, device
+        )
+        print(f"{bs:>6} | {baseline:>8.1f} ep/s | {fast:>12.1f} ep/s | {resident:>7.1f} ep/s | "
+              f"{resident / baseline:>6.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""
+Benchmark do Parser do Formato CMU (Boston Housing)
+Compara o parser legado (linha a linha) com o parser vetorizado
+
+O arquivo sintético usa o cabeçalho original da CMU (22 linhas), então as
+verificações também cobrem a detecção do início dos dados, nos dois parsers
+(em memória e em streaming, com pedaços pequenos que cortam o cabeçalho).
+
+Uso:
+    python benchmarks/bench_parser.py --rows 1000000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src.dataset import (
+    BostonParseError, CMU_HEADER, generate_synthetic_boston, iter_boston_blocks, parse_boston_file, write_boston_file
+)
+
+
+def check_cmu_header(tmp: str) -> None:
+    """Regressão: o cabeçalho real da CMU não pode ser lido como dados"""
+    data = generate_synthetic_boston(50, seed=0)
+    path = os.path.join(tmp, 'boston_header.txt')
+    write_boston_file(path, data, header=CMU_HEADER)
+    expected = parse_boston_file(path)
+    assert expected.shape == data.shape, expected.shape
+    assert np.allclose(expected, data, rtol=1e-5)
+    for chunk_bytes in (64, 256, 1 << 20):
+        streamed = np.concatenate(list(iter_boston_blocks(path, block_rows=7, chunk_bytes=chunk_bytes)))
+        assert np.array_equal(streamed, expected), chunk_bytes
+    print(f"✅ Cabeçalho da CMU ({CMU_HEADER.count(chr(10))} linhas): parser em memória e streaming OK")
+
+
+def check_bad_first_token(tmp: str) -> None:
+    """Regressão: token inválido na primeira linha de dados é reportado, não lido como cabeçalho"""
+    data = generate_synthetic_boston(20, seed=0)
+    path = os.path.join(tmp, 'boston_bad_first.txt')
+    write_boston_file(path, data, header=CMU_HEADER)
+    with open(path) as f:
+        lines = f.read().split('\n')
+    first = CMU_HEADER.count('\n')
+    tokens = lines[first].split()
+    lines[first] = lines[first].replace(tokens[0], 'abc', 1)
+    with open(path, 'w') as f:
+        f.write('\n'.join(lines))
+
+    expected = [(0, 0, first + 1, 'abc')]
+    for name, parse in (
+        ('em memória', lambda: parse_boston_file(path)),
+        ('streaming', lambda: list(iter_boston_blocks(path, block_rows=7, chunk_bytes=256))),
+    ):
+        try:
+            parse()
+        except BostonParseError as e:
+            assert e.bad_tokens == expected, (name, e.bad_tokens)
+        else:
+            raise AssertionError(f"{name}: token inválido não detectado")
+    print(f"✅ Token inválido na primeira linha de dados reportado: registro 0 coluna 0 (linha {first + 1})")
+
+
+def legacy_parse(content: str, n_columns: int = 14) -> np.ndarray:
+    """Parser original de load_boston_data (split + float() por token)"""
+    lines = content.split('\n')
+    data_start = 0
+    for i, line in enumerate(lines):
+        if line.strip() and not line.strip()[0].isalpha():
+            data_start = i
+            break
+
+    data_values = []
+    for line in lines[data_start:]:
+        if line.strip():
+            values = line.split()
+            if len(values) > 0:
+                try:
+                    data_values.extend([float(v) for v in values])
+                except ValueError:
+                    continue
+
+    data_array = np.array(data_values)
+    n_samples = len(data_array) // n_columns
+    return data_array[:n_samples * n_columns].reshape(n_samples, n_columns)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1_000_000, help='Registros no arquivo sintético')
+    parser.add_argument('--skip-legacy', action='store_true', help='Não executar o parser legado')
+    args = parser.parse_args()
+
+    data = generate_synthetic_boston(args.rows, seed=42)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        check_cmu_header(tmp)
+        check_bad_first_token(tmp)
+
+        path = os.path.join(tmp, 'boston_synthetic.txt')
+        write_boston_file(path, data)
+        size_mb = os.path.getsize(path) / 1e6
+        print(f"📄 Arquivo sintético: {args.rows:,} registros ({size_mb:.1f} MB)")
+
+        start = time.perf_counter()
+        parsed = parse_boston_file(path)
+        t_vectorized = time.perf_counter() - start
+        print(f"  ⚡ Vetorizado: {t_vectorized:.3f} s ({args.rows / t_vectorized:,.0f} registros/s)")
+        assert parsed.shape == data.shape
+
+        if not args.skip_legacy:
+            start = time.perf_counter()
+            with open(path, 'r', encoding='utf-8') as f:
+                legacy = legacy_parse(f.read())
+            t_legacy = time.perf_counter() - start
+            print(f"  🐢 Legado:     {t_legacy:.3f} s ({args.rows / t_legacy:,.0f} registros/s)")
+            print(f"  📈 Speedup:    {t_legacy / t_vectorized:.1f}x")
+            assert np.array_equal(parsed, legacy)
+
+
+if __name__ == '__main__':
+    main()
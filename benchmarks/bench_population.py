@@ -0,0 +1,62 @@
+"""
+Benchmark do PBT Vetorizado: população em StackedMLP vs treinos sequenciais
+Mede ms/época da população com P membros contra P treinos de um MLP (fit)
+
+Uso:
+    python benchmarks/bench_population.py --sizes 1 8 64 --epochs 100
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import torch
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src.dataset import load_boston_data, get_kfold_splits
+from src.fused import train_population
+from src.train import DEFAULT_CONFIG, fit, prepare_fold
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 8, 64])
+    parser.add_argument('--epochs', type=int, default=100)
+    parser.add_argument('--batch-size', type=int, default=16)
+    parser.add_argument('--hidden-dims', type=int, nargs='+', default=[64, 32])
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    device = torch.device('cpu')
+    df = load_boston_data()
+    X = df.drop('MEDV', axis=1).values
+    y = df['MEDV'].values
+    fold = get_kfold_splits(X, y, n_splits=5, seed=args.seed)[0]
+
+    # Referência: um MLP com o fit padrão (mesmo número de épocas, sem Early Stopping)
+    config = {**DEFAULT_CONFIG, 'hidden_dims': args.hidden_dims, 'batch_size': args.batch_size, 'seed': args.seed}
+    model, train_loader, val_loader, optimizer = prepare_fold(fold, config, device)
+    start = time.perf_counter()
+    history = fit(model, train_loader, val_loader, optimizer, device,
+                  max_epochs=args.epochs, patience=args.epochs)
+    single_ms = (time.perf_counter() - start) / args.epochs * 1e3
+    print(f"📏 MLP único (fit): {single_ms:.1f} ms/época, melhor val loss {history['best_val_loss']:.4f}\n")
+
+    print(f"{'P':>4} | {'ms/época':>9} | {'P x fit (ms)':>12} | {'speedup':>7} | {'exploits':>8} | {'melhor val':>10}")
+    print("-" * 66)
+    for size in args.sizes:
+        start = time.perf_counter()
+        result = train_population(
+            fold, population_size=size, hidden_dims=args.hidden_dims, batch_size=args.batch_size,
+            max_epochs=args.epochs, patience=args.epochs, seed=args.seed, device=device
+        )
+        epochs = len(result['val_losses'])
+        population_ms = (time.perf_counter() - start) / epochs * 1e3
+        sequential_ms = size * single_ms
+        print(f"{size:>4} | {population_ms:>9.1f} | {sequential_ms:>12.1f} | {sequential_ms / population_ms:>6.1f}x | "
+              f"{result['n_exploits']:>8d} | {result['best_val_loss']:>10.4f}")
+
+
+if __name__ == '__main__':
+    main()
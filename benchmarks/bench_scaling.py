@@ -0,0 +1,62 @@
+"""
+Benchmark de Escala: Treino e Inferência com Dados Sintéticos
+Mede throughput (amostras/s) de treino e inferência para N crescente, sem rede
+
+Uso:
+    python benchmarks/bench_scaling.py --sizes 10000 100000 1000000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src.dataset import BostonDataset, FastTensorLoader, generate_synthetic_boston
+from src.model import MLP
+from src.train import train_epoch, get_predictions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--inference-batch-size', type=int, default=4096)
+    parser.add_argument('--workers', type=int, default=4, help='Threads do gerador')
+    args = parser.parse_args()
+
+    device = torch.device('cpu')
+    print(f"{'N':>12} | {'geração':>10} | {'treino (amostras/s)':>20} | {'inferência (amostras/s)':>24}")
+    print("-" * 76)
+
+    for n in args.sizes:
+        start = time.perf_counter()
+        data = generate_synthetic_boston(n, seed=42, n_workers=args.workers, dtype=np.float32)
+        t_gen = time.perf_counter() - start
+
+        X, y = data[:, :-1], data[:, -1]
+        mean, std = X.mean(axis=0), X.std(axis=0)
+        dataset = BostonDataset(X, y, mean=mean, std=std)
+
+        torch.manual_seed(42)
+        model = MLP(input_dim=13, hidden_dims=[64, 32], dropout_rate=0.3).to(device)
+        optimizer = torch.optim.Adam(model.parameters(), lr=1e-3)
+        train_loader = FastTensorLoader(dataset, batch_size=args.batch_size, shuffle=True, device=device)
+        start = time.perf_counter()
+        train_epoch(model, train_loader, nn.MSELoss(), optimizer, device)
+        train_rate = n / (time.perf_counter() - start)
+
+        infer_loader = FastTensorLoader(dataset, batch_size=args.inference_batch_size, device=device)
+        start = time.perf_counter()
+        get_predictions(model, infer_loader, device)
+        infer_rate = n / (time.perf_counter() - start)
+
+        print(f"{n:>12,} | {t_gen:>8.2f} s | {train_rate:>20,.0f} | {infer_rate:>24,.0f}")
+
+
+if __name__ == '__main__':
+    main()
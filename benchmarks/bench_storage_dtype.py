@@ -0,0 +1,107 @@
+"""
+Benchmark de Armazenamento Compacto: float32 vs float16 vs bfloat16
+Compara memória das features dos folds e MSE do K-Fold lado a lado
+
+Antes, verifica que o cache de folds em disco separa os dtypes: um pedido
+float32 depois de um float16 no mesmo cache_dir recebe features exatas.
+
+Uso:
+    python benchmarks/bench_storage_dtype.py --k-folds 5 --max-epochs 200
+"""
+
+import argparse
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src.dataset import (
+    clear_fold_cache, generate_synthetic_boston, get_kfold_splits, load_boston_data, make_fold_loaders
+)
+from src.model import MLP
+from src.train import train_epoch, validate_epoch, get_predictions, EarlyStopping
+
+
+def check_fold_cache_dtypes() -> None:
+    """Regressão: o .npz de um run float16 não pode servir um pedido float32"""
+    data = generate_synthetic_boston(200, seed=0)
+    X, y = data[:, :-1], data[:, -1]
+    expected = get_kfold_splits(X, y, n_splits=3, seed=0)
+    with tempfile.TemporaryDirectory() as tmp:
+        for dtype in (torch.float16, torch.bfloat16, torch.float32):
+            # Sem cache em memória: simula outro processo lendo o cache_dir
+            clear_fold_cache()
+            get_kfold_splits(X, y, n_splits=3, seed=0, cache_dir=tmp, storage_dtype=dtype)
+        clear_fold_cache()
+        folds = get_kfold_splits(X, y, n_splits=3, seed=0, cache_dir=tmp)
+    for fold, reference in zip(folds, expected):
+        assert fold['X_train'].dtype == torch.float32
+        assert torch.equal(fold['X_train'], reference['X_train']), fold['fold']
+        assert torch.equal(fold['X_val'], reference['X_val']), fold['fold']
+    clear_fold_cache()
+    print("✅ Cache de folds em disco: float32 após float16/bfloat16 no mesmo cache_dir é exato")
+
+
+def kfold_mse(folds, max_epochs: int, patience: int, seed: int) -> float:
+    """Treina um MLP por fold e retorna o MSE médio de validação"""
+    device = torch.device('cpu')
+    criterion = nn.MSELoss()
+    fold_mse = []
+    for fold in folds:
+        torch.manual_seed(seed)
+        train_loader, val_loader = make_fold_loaders(
+            fold, batch_size=16, generator=torch.Generator().manual_seed(seed)
+        )
+        model = MLP(input_dim=13, hidden_dims=[64, 32], dropout_rate=0.3).to(device)
+        optimizer = torch.optim.Adam(model.parameters(), lr=1e-3, weight_decay=1e-4)
+        early_stopping = EarlyStopping(patience=patience)
+        best_val, best_state = float('inf'), None
+        for _ in range(max_epochs):
+            train_epoch(model, train_loader, criterion, optimizer, device)
+            val_loss = validate_epoch(model, val_loader, criterion, device)
+            if val_loss < best_val:
+                best_val = val_loss
+                best_state = {k: v.detach().clone() for k, v in model.state_dict().items()}
+            if early_stopping(val_loss):
+                break
+        model.load_state_dict(best_state)
+        y_true, y_pred = get_predictions(model, val_loader, device)
+        fold_mse.append(float(np.mean((y_true - y_pred) ** 2)))
+    return float(np.mean(fold_mse))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--k-folds', type=int, default=5)
+    parser.add_argument('--max-epochs', type=int, default=200)
+    parser.add_argument('--patience', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    check_fold_cache_dtypes()
+    df = load_boston_data()
+    X = df.drop('MEDV', axis=1).values
+    y = df['MEDV'].values
+
+    print(f"{'dtype':>10} | {'memória features (K folds)':>27} | {'MSE médio':>10} | {'Δ vs float32':>12}")
+    print("-" * 70)
+    reference = None
+    for dtype in (torch.float32, torch.float16, torch.bfloat16):
+        folds = get_kfold_splits(X, y, n_splits=args.k_folds, seed=args.seed, storage_dtype=dtype)
+        n_bytes = sum(
+            f['X_train'].element_size() * f['X_train'].nelement()
+            + f['X_val'].element_size() * f['X_val'].nelement()
+            for f in folds
+        )
+        mse = kfold_mse(folds, args.max_epochs, args.patience, args.seed)
+        reference = mse if reference is None else reference
+        name = str(dtype).replace('torch.', '')
+        print(f"{name:>10} | {n_bytes / 1024:>23.1f} KiB | {mse:>10.4f} | {mse - reference:>+12.4f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+Benchmark do Ajuste de Threads: µs por iteração do MLP para cada número de threads
+Treino (forward + backward + Adam) e inferência, em vários tamanhos de batch.
+Com --workers, cada medição roda em N processos simultâneos (a disputa por
+núcleos dos workers de run_kfold/run_parallel_search)
+
+Uso:
+    python benchmarks/bench_threads.py --threads 1 2 4 8 --batch-sizes 1 16 64
+    python benchmarks/bench_threads.py --workers 1 2 4 --batch-sizes 16 --modes train
+"""
+
+import argparse
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src.runtime import available_cores, thread_candidates, tune_threads
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--threads', type=int, nargs='+', default=None,
+                        help='Candidatos intra-op (padrão: potências de 2 até os núcleos)')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 16, 64])
+    parser.add_argument('--hidden-dims', type=int, nargs='+', default=[64, 32])
+    parser.add_argument('--interop', action='store_true', help='Mede também threads inter-op')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1],
+                        help='Processos medindo ao mesmo tempo (um bloco da tabela por valor)')
+    parser.add_argument('--modes', nargs='+', default=['train', 'inference'], choices=['train', 'inference'])
+    args = parser.parse_args()
+
+    print(f"🖥️ Núcleos disponíveis: {available_cores()}")
+    # Cache temporário: sempre mede
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_workers in args.workers:
+            candidates = args.threads or thread_candidates(max(1, available_cores() // n_workers))
+            print(f"\n👥 {n_workers} worker(s) | candidatos: {candidates}")
+            print(f"{'modo':>9} | {'batch':>5} | " + " | ".join(f"{n:>3} thr (µs)" for n in candidates)
+                  + " | escolha")
+            print("-" * (30 + 15 * len(candidates)))
+            for mode in args.modes:
+                for batch_size in args.batch_sizes:
+                    settings = tune_threads(
+                        hidden_dims=args.hidden_dims, batch_size=batch_size, mode=mode,
+                        n_workers=n_workers, candidates=candidates, probe_interop=args.interop,
+                        cache_path=Path(tmp) / 'threads.json', apply=False
+                    )
+                    timings = settings['timings']
+                    cells = " | ".join(
+                        f"{timings[str(n)]:>12.1f}" if timings[str(n)] is not None else f"{'—':>12}"
+                        for n in candidates
+                    )
+                    choice = f"{settings['intra_op']}" + (
+                        f" (inter-op {settings['inter_op']})" if settings['inter_op'] is not None else ""
+                    )
+                    print(f"{mode:>9} | {batch_size:>5} | {cells} | {choice}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark de Warm Start entre Trials do Optuna
+Roda o mesmo estudo (TPE, sem pruning) com e sem WarmStartRegistry e
+compara épocas até a convergência, tempo total e melhor MSE
+
+Uso:
+    python benchmarks/bench_warm_start.py --n-trials 20 --max-epochs 100
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import optuna
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src.dataset import load_boston_data
+from src.model import WarmStartRegistry
+from src.tuning import KFoldObjective
+
+
+def run_study(X, y, args, warm_start) -> dict:
+    objective = KFoldObjective(
+        X, y, n_splits=args.k_folds, seed=args.seed,
+        max_epochs=args.max_epochs, patience=args.patience, warm_start=warm_start
+    )
+    study = optuna.create_study(
+        direction='minimize',
+        sampler=optuna.samplers.TPESampler(seed=args.seed),
+        pruner=optuna.pruners.NopPruner()
+    )
+    start = time.perf_counter()
+    study.optimize(objective, n_trials=args.n_trials)
+    elapsed = time.perf_counter() - start
+    epochs = [sum(t.user_attrs['fold_epochs']) for t in study.trials]
+    return {
+        'time': elapsed,
+        'epochs': int(np.sum(epochs)),
+        'epochs_late': float(np.mean(epochs[len(epochs) // 2:])),
+        'best': study.best_value,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--n-trials', type=int, default=20)
+    parser.add_argument('--k-folds', type=int, default=3)
+    parser.add_argument('--max-epochs', type=int, default=100)
+    parser.add_argument('--patience', type=int, default=15)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+    df = load_boston_data()
+    X = df.drop('MEDV', axis=1).values
+    y = df['MEDV'].values
+
+    print(f"{'modo':>11} | {'tempo (s)':>9} | {'épocas totais':>13} | {'épocas/trial (2ª metade)':>24} | {'melhor MSE':>10}")
+    print("-" * 82)
+    results = {}
+    for name, registry in (('do zero', None), ('warm start', WarmStartRegistry())):
+        r = run_study(X, y, args, registry)
+        results[name] = r
+        print(f"{name:>11} | {r['time']:>9.2f} | {r['epochs']:>13d} | {r['epochs_late']:>24.1f} | {r['best']:>10.4f}")
+
+    reduction = 1 - results['warm start']['time'] / results['do zero']['time']
+    print(f"\n⏱️ Redução do tempo total: {reduction:.0%}")
+
+
+if __name__ == '__main__':
+    main()
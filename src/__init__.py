@@ -9,17 +9,41 @@ Matrícula: 20220014216
 __version__ = "1.0.0"
 __author__ = "Cauã Vitor Figueredo Silva"
 
-from .dataset import load_boston_data, BostonDataset
-from .model import MLP
-from .train import train_epoch, validate_epoch
+from .dataset import (
+    load_boston_data,
+    generate_synthetic_boston,
+    get_kfold_splits,
+    BostonDataset,
+    BostonIterableDataset,
+    FastTensorLoader
+)
+from .model import MLP, WarmStartRegistry
+from .fused import StackedMLP, train_folds_fused, train_population
+from .store import RunningStats, IncrementalBostonStore
+from .runtime import tune_threads
+from .train import train_epoch, validate_epoch, fit, run_kfold, CheckpointManager
 from .visualization import plot_learning_curves, plot_predictions
 
 __all__ = [
     'load_boston_data',
+    'generate_synthetic_boston',
+    'get_kfold_splits',
     'BostonDataset',
+    'BostonIterableDataset',
+    'FastTensorLoader',
     'MLP',
+    'WarmStartRegistry',
+    'StackedMLP',
+    'train_folds_fused',
+    'train_population',
+    'RunningStats',
+    'IncrementalBostonStore',
+    'tune_threads',
     'train_epoch',
     'validate_epoch',
+    'fit',
+    'run_kfold',
+    'CheckpointManager',
     'plot_learning_curves',
     'plot_predictions'
 ]
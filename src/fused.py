@@ -0,0 +1,684 @@
+"""
+Módulo de Treinamento Vetorizado (Fused)
+Treina vários MLPs de mesma arquitetura em um único passe (ex.: os K folds
+ou uma população de hiperparâmetros)
+"""
+
+import numpy as np
+import torch
+import torch.nn as nn
+from typing import List, Dict, Optional, Sequence, Tuple, Union
+
+from . import runtime
+from .model import MLP
+from .train import EarlyStopping
+
+
+def _mlp_layer_indices(n_hidden: int, use_batch_norm: bool, use_dropout: bool) -> List[Tuple[int, Optional[int]]]:
+    """
+    Índices (Linear, BatchNorm) de cada camada dentro do nn.Sequential do MLP,
+    reproduzindo a ordem de construção em MLP.__init__.
+    """
+    indices = []
+    idx = 0
+    for _ in range(n_hidden):
+        linear_idx = idx
+        idx += 1
+        bn_idx = None
+        if use_batch_norm:
+            bn_idx = idx
+            idx += 1
+        idx += 1  # ReLU
+        if use_dropout:
+            idx += 1
+        indices.append((linear_idx, bn_idx))
+    indices.append((idx, None))  # Camada de saída
+    return indices
+
+
+class StackedMLP(nn.Module):
+    """
+    K MLPs de mesma arquitetura com parâmetros empilhados na dimensão 0.
+    
+    Cada camada Linear vira um matmul em lote (K, B, in) x (K, in, out), de
+    forma que forward e backward dos K membros rodam juntos. Os membros são
+    independentes: o gradiente de cada um depende apenas da própria perda.
+    BatchNorm usa estatísticas por membro (respeitando a máscara de amostras
+    válidas) e o dropout pode ter taxa diferente por membro.
+    
+    Exemplo:
+        >>> stacked = StackedMLP.from_models([MLP(hidden_dims=[64, 32]) for _ in range(5)])
+        >>> predictions = stacked(X_batch)  # (5, B, 13) -> (5, B, 1)
+    """
+    
+    def __init__(
+        self,
+        n_members: int,
+        input_dim: int = 13,
+        hidden_dims: List[int] = [64, 32],
+        output_dim: int = 1,
+        dropout_rate: Union[float, Sequence[float]] = 0.3,
+        use_batch_norm: bool = False
+    ):
+        """
+        Args:
+            n_members: Número de modelos empilhados (K)
+            input_dim: Número de features de entrada
+            hidden_dims: Dimensões das camadas ocultas
+            output_dim: Dimensão da saída
+            dropout_rate: Taxa de dropout (escalar ou uma por membro)
+            use_batch_norm: Se True, aplica Batch Normalization antes da ativação
+        """
+        super(StackedMLP, self).__init__()
+        
+        self.n_members = n_members
+        self.input_dim = input_dim
+        self.hidden_dims = list(hidden_dims)
+        self.output_dim = output_dim
+        self.use_batch_norm = use_batch_norm
+        self.bn_eps = 1e-5
+        self.bn_momentum = 0.1
+        
+        rates = torch.as_tensor(dropout_rate, dtype=torch.float32).expand(n_members).clone()
+        self.register_buffer('dropout_rate', rates)
+        
+        dims = [input_dim] + self.hidden_dims + [output_dim]
+        self.weights = nn.ParameterList()
+        self.biases = nn.ParameterList()
+        for i in range(len(dims) - 1):
+            weight = torch.empty(n_members, dims[i + 1], dims[i])
+            for k in range(n_members):
+                nn.init.xavier_uniform_(weight[k])
+            self.weights.append(nn.Parameter(weight))
+            self.biases.append(nn.Parameter(torch.zeros(n_members, dims[i + 1])))
+        
+        self.bn_weights = nn.ParameterList()
+        self.bn_biases = nn.ParameterList()
+        if use_batch_norm:
+            for i, hidden_dim in enumerate(self.hidden_dims):
+                self.bn_weights.append(nn.Parameter(torch.ones(n_members, hidden_dim)))
+                self.bn_biases.append(nn.Parameter(torch.zeros(n_members, hidden_dim)))
+                self.register_buffer(f'running_mean_{i}', torch.zeros(n_members, hidden_dim))
+                self.register_buffer(f'running_var_{i}', torch.ones(n_members, hidden_dim))
+                self.register_buffer(f'num_batches_tracked_{i}', torch.zeros(n_members, dtype=torch.long))
+    
+    @classmethod
+    def from_models(cls, models: Sequence[MLP]) -> 'StackedMLP':
+        """Empilha MLPs já inicializados (mesma arquitetura)"""
+        first = models[0]
+        stacked = cls(
+            n_members=len(models),
+            input_dim=first.input_dim,
+            hidden_dims=first.hidden_dims,
+            output_dim=first.network[-1].out_features,
+            dropout_rate=[m.dropout_rate for m in models],
+            use_batch_norm=first.use_batch_norm
+        )
+        for k, model in enumerate(models):
+            stacked.load_member_state_dict(k, model.state_dict())
+        return stacked.to(first.network[0].weight.device)
+    
+    def _keys(self, k: int) -> List[Tuple[int, Optional[int]]]:
+        use_dropout = float(self.dropout_rate[k]) > 0.0
+        return _mlp_layer_indices(len(self.hidden_dims), self.use_batch_norm, use_dropout)
+    
+    def member_state_dict(self, k: int) -> Dict[str, torch.Tensor]:
+        """state_dict do membro k no formato de MLP (cópia desacoplada)"""
+        state = {}
+        for layer, (linear_idx, bn_idx) in enumerate(self._keys(k)):
+            state[f'network.{linear_idx}.weight'] = self.weights[layer][k].detach().clone()
+            state[f'network.{linear_idx}.bias'] = self.biases[layer][k].detach().clone()
+            if bn_idx is not None:
+                state[f'network.{bn_idx}.weight'] = self.bn_weights[layer][k].detach().clone()
+                state[f'network.{bn_idx}.bias'] = self.bn_biases[layer][k].detach().clone()
+                state[f'network.{bn_idx}.running_mean'] = getattr(self, f'running_mean_{layer}')[k].clone()
+                state[f'network.{bn_idx}.running_var'] = getattr(self, f'running_var_{layer}')[k].clone()
+                state[f'network.{bn_idx}.num_batches_tracked'] = getattr(self, f'num_batches_tracked_{layer}')[k].clone()
+        return state
+    
+    @torch.no_grad()
+    def load_member_state_dict(self, k: int, state_dict: Dict[str, torch.Tensor]) -> None:
+        """Carrega um state_dict de MLP no membro k"""
+        for layer, (linear_idx, bn_idx) in enumerate(self._keys(k)):
+            self.weights[layer][k].copy_(state_dict[f'network.{linear_idx}.weight'])
+            self.biases[layer][k].copy_(state_dict[f'network.{linear_idx}.bias'])
+            if bn_idx is not None:
+                self.bn_weights[layer][k].copy_(state_dict[f'network.{bn_idx}.weight'])
+                self.bn_biases[layer][k].copy_(state_dict[f'network.{bn_idx}.bias'])
+                getattr(self, f'running_mean_{layer}')[k].copy_(state_dict[f'network.{bn_idx}.running_mean'])
+                getattr(self, f'running_var_{layer}')[k].copy_(state_dict[f'network.{bn_idx}.running_var'])
+                getattr(self, f'num_batches_tracked_{layer}')[k].copy_(
+                    state_dict[f'network.{bn_idx}.num_batches_tracked']
+                )
+    
+    @torch.no_grad()
+    def copy_member(self, src: int, dst: int) -> None:
+        """Copia parâmetros e buffers do membro src para dst"""
+        for tensor in list(self.parameters()) + list(self.buffers()):
+            if tensor.dim() > 0 and tensor.shape[0] == self.n_members and tensor is not self.dropout_rate:
+                tensor[dst] = tensor[src]
+    
+    def _batch_norm(self, h: torch.Tensor, layer: int, mask: Optional[torch.Tensor]) -> torch.Tensor:
+        """BatchNorm1d por membro; em treino, apenas amostras válidas entram nas estatísticas"""
+        gamma = self.bn_weights[layer].unsqueeze(1)
+        beta = self.bn_biases[layer].unsqueeze(1)
+        running_mean = getattr(self, f'running_mean_{layer}')
+        running_var = getattr(self, f'running_var_{layer}')
+        
+        if not self.training:
+            mean, var = running_mean.unsqueeze(1), running_var.unsqueeze(1)
+        else:
+            m = torch.ones_like(h[..., :1]) if mask is None else mask.unsqueeze(-1).to(h.dtype)
+            count = m.sum(dim=1, keepdim=True)                       # (K, 1, 1)
+            safe_count = count.clamp(min=1.0)
+            mean = (h * m).sum(dim=1, keepdim=True) / safe_count
+            var = (((h - mean) ** 2) * m).sum(dim=1, keepdim=True) / safe_count
+            
+            with torch.no_grad():
+                active = count.view(-1) > 0
+                unbiased = var.squeeze(1) * (count.view(-1, 1) / (count.view(-1, 1) - 1).clamp(min=1.0))
+                new_mean = (1 - self.bn_momentum) * running_mean + self.bn_momentum * mean.squeeze(1)
+                new_var = (1 - self.bn_momentum) * running_var + self.bn_momentum * unbiased
+                running_mean.copy_(torch.where(active.unsqueeze(1), new_mean, running_mean))
+                running_var.copy_(torch.where(active.unsqueeze(1), new_var, running_var))
+                getattr(self, f'num_batches_tracked_{layer}').add_(active.long())
+        
+        return (h - mean) / torch.sqrt(var + self.bn_eps) * gamma + beta
+    
+    def forward(
+        self,
+        x: torch.Tensor,
+        mask: Optional[torch.Tensor] = None,
+        generator: Optional[torch.Generator] = None
+    ) -> torch.Tensor:
+        """
+        Forward pass dos K membros
+        
+        Args:
+            x: Input (K, B, input_dim) ou (B, input_dim) compartilhado por todos
+            mask: Amostras válidas (K, B), usada pelo BatchNorm em treino (opcional)
+            generator: torch.Generator das máscaras de dropout (opcional)
+        
+        Returns:
+            Output tensor (K, B, output_dim)
+        """
+        h = x
+        n_layers = len(self.weights)
+        for layer in range(n_layers):
+            h = torch.matmul(h, self.weights[layer].transpose(1, 2)) + self.biases[layer].unsqueeze(1)
+            if layer == n_layers - 1:
+                break
+            if self.use_batch_norm:
+                h = self._batch_norm(h, layer, mask)
+            h = torch.relu(h)
+            if self.training and bool((self.dropout_rate > 0).any()):
+                p = self.dropout_rate.view(-1, 1, 1)
+                keep = torch.rand(h.shape, generator=generator, device=h.device) >= p
+                h = h * keep / (1 - p)
+        return h
+
+
+class StackedOptimizer:
+    """
+    Adam/RMSprop para parâmetros empilhados (dimensão 0 = membro).
+    
+    As fórmulas são as mesmas de torch.optim.Adam/RMSprop (elemento a
+    elemento), mas com learning rate, weight decay e contador de passos por
+    membro, e um passo mascarado: membros inativos (sem batch neste passo ou
+    já parados pelo Early Stopping) não têm parâmetros nem estado alterados.
+    """
+    
+    def __init__(
+        self,
+        params: Sequence[nn.Parameter],
+        n_members: int,
+        name: str = 'Adam',
+        lr: Union[float, Sequence[float]] = 1e-3,
+        weight_decay: Union[float, Sequence[float]] = 0.0,
+        betas: Tuple[float, float] = (0.9, 0.999),
+        alpha: float = 0.99,
+        eps: float = 1e-8
+    ):
+        """
+        Args:
+            params: Parâmetros empilhados (ex.: StackedMLP.parameters())
+            n_members: Número de membros (K)
+            name: 'Adam' ou 'RMSprop'
+            lr: Learning rate (escalar ou um por membro)
+            weight_decay: Regularização L2 (escalar ou um por membro)
+            betas: Coeficientes do Adam
+            alpha: Coeficiente de suavização do RMSprop
+            eps: Termo de estabilidade numérica
+        """
+        if name not in ('Adam', 'RMSprop'):
+            raise ValueError(f"Otimizador não suportado no modo vetorizado: {name}")
+        self.params = list(params)
+        self.n_members = n_members
+        self.name = name
+        self.lr = torch.as_tensor(lr, dtype=torch.float64).expand(n_members).clone()
+        self.weight_decay = torch.as_tensor(weight_decay, dtype=torch.float64).expand(n_members).clone()
+        self.betas = betas
+        self.alpha = alpha
+        self.eps = eps
+        self.steps = torch.zeros(n_members, dtype=torch.float64)
+        self.state = []
+        for p in self.params:
+            if name == 'Adam':
+                self.state.append({'exp_avg': torch.zeros_like(p), 'exp_avg_sq': torch.zeros_like(p)})
+            else:
+                self.state.append({'square_avg': torch.zeros_like(p)})
+    
+    def zero_grad(self) -> None:
+        for p in self.params:
+            p.grad = None
+    
+    @staticmethod
+    def _per_member(values: torch.Tensor, like: torch.Tensor) -> torch.Tensor:
+        """Redimensiona (K,) para broadcast com um parâmetro (K, ...)"""
+        return values.to(device=like.device, dtype=like.dtype).view(-1, *([1] * (like.dim() - 1)))
+    
+    @torch.no_grad()
+    def step(self, active: Optional[torch.Tensor] = None) -> None:
+        """
+        Executa um passo de otimização nos membros ativos
+        
+        Args:
+            active: Máscara booleana (K,) dos membros a atualizar (padrão: todos)
+        """
+        if active is None:
+            active = torch.ones(self.n_members, dtype=torch.bool)
+        active = active.cpu()
+        if not bool(active.any()):
+            return
+        
+        self.steps += active.double()
+        beta1, beta2 = self.betas
+        bias_correction1 = 1 - beta1 ** self.steps.clamp(min=1)
+        bias_correction2_sqrt = (1 - beta2 ** self.steps.clamp(min=1)).sqrt()
+        
+        for p, state in zip(self.params, self.state):
+            if p.grad is None:
+                continue
+            mask = self._per_member(active, p).bool()
+            grad = p.grad + self._per_member(self.weight_decay, p) * p
+            
+            if self.name == 'Adam':
+                exp_avg = state['exp_avg'].lerp(grad, 1 - beta1)
+                exp_avg_sq = state['exp_avg_sq'].mul(beta2).addcmul_(grad, grad, value=1 - beta2)
+                step_size = self._per_member(self.lr / bias_correction1, p)
+                denom = exp_avg_sq.sqrt() / self._per_member(bias_correction2_sqrt, p) + self.eps
+                new_p = p - step_size * exp_avg / denom
+                state['exp_avg'] = torch.where(mask, exp_avg, state['exp_avg'])
+                state['exp_avg_sq'] = torch.where(mask, exp_avg_sq, state['exp_avg_sq'])
+            else:
+                square_avg = state['square_avg'].mul(self.alpha).addcmul_(grad, grad, value=1 - self.alpha)
+                avg = square_avg.sqrt().add_(self.eps)
+                new_p = p - self._per_member(self.lr, p) * grad / avg
+                state['square_avg'] = torch.where(mask, square_avg, state['square_avg'])
+            
+            p.copy_(torch.where(mask, new_p, p))
+    
+    @torch.no_grad()
+    def copy_member(self, src: int, dst: int) -> None:
+        """Copia estado do otimizador (momentos e contador) do membro src para dst"""
+        for state in self.state:
+            for tensor in state.values():
+                tensor[dst] = tensor[src]
+        self.steps[dst] = self.steps[src]
+
+
+def _padded(tensors: Sequence[torch.Tensor], device: torch.device) -> torch.Tensor:
+    """Empilha tensores (n_k, ...) em (K, max n_k + 1, ...); a última linha é padding zero"""
+    n_max = max(len(t) for t in tensors)
+    out = torch.zeros((len(tensors), n_max + 1) + tuple(tensors[0].shape[1:]), device=device)
+    for k, t in enumerate(tensors):
+        out[k, :len(t)] = t.to(device).float()
+    return out
+
+
+def _batched_val_loss(
+    model: StackedMLP,
+    X_val: torch.Tensor,
+    y_val: torch.Tensor,
+    n_val: torch.Tensor,
+    batch_size: int
+) -> torch.Tensor:
+    """
+    Loss de validação por membro com a mesma média de validate_epoch
+    (média das médias de cada batch, na ordem original).
+    """
+    n_max = X_val.shape[1] - 1
+    n_batches = (n_max + batch_size - 1) // batch_size
+    positions = torch.arange(n_batches * batch_size, device=X_val.device)
+    valid = positions.unsqueeze(0) < n_val.unsqueeze(1)               # (K, nb*B)
+    idx = torch.where(valid, positions.unsqueeze(0), torch.full_like(positions, n_max).unsqueeze(0))
+    rows = torch.arange(len(X_val), device=X_val.device).unsqueeze(1)
+    
+    predictions = model(X_val[rows, idx]).squeeze(-1)
+    sq_err = (predictions - y_val[rows, idx]) ** 2 * valid
+    
+    sq_err = sq_err.view(len(X_val), n_batches, batch_size)
+    counts = valid.view(len(X_val), n_batches, batch_size).sum(dim=2)
+    batch_means = sq_err.sum(dim=2) / counts.clamp(min=1)
+    n_valid_batches = (counts > 0).sum(dim=1)
+    return batch_means.sum(dim=1) / n_valid_batches
+
+
+def train_folds_fused(
+    folds: List[Dict],
+    hidden_dims: List[int] = [64, 32],
+    dropout_rate: float = 0.3,
+    use_batch_norm: bool = False,
+    optimizer_name: str = 'Adam',
+    learning_rate: float = 1e-3,
+    weight_decay: float = 1e-4,
+    batch_size: int = 16,
+    max_epochs: int = 500,
+    patience: int = 20,
+    seed: int = 42,
+    device: torch.device = torch.device('cpu'),
+    tune_threads: bool = True
+) -> List[Dict]:
+    """
+    Treina os K modelos do K-Fold juntos, em um único passe vetorizado.
+    
+    A cada passo, o j-ésimo batch de cada fold é empilhado em (K, B, F) e um
+    único forward/backward atualiza os K modelos (perda total = soma das
+    perdas por fold, logo os gradientes são independentes). Folds com menos
+    batches ou já parados pelo Early Stopping ficam mascarados no otimizador.
+    
+    Convenção de seeds (a mesma do caminho sequencial): o modelo do fold k é
+    inicializado após torch.manual_seed(seed + k) e o embaralhamento usa
+    torch.Generator().manual_seed(seed + k), como um FastTensorLoader com
+    esse generator. Sem dropout, os state_dicts resultantes coincidem com o
+    treino sequencial a menos de arredondamento de ponto flutuante. Com
+    dropout, as máscaras vêm de outro stream aleatório; com BatchNorm, o
+    gradiente dos bias anteriores ao BN é apenas ruído de arredondamento,
+    que o Adam/RMSprop amplifica. Nesses dois casos a equivalência é
+    estatística (mesmo MSE esperado), não bit a bit.
+    
+    Args:
+        folds: Folds de get_kfold_splits
+        hidden_dims: Dimensões das camadas ocultas
+        dropout_rate: Taxa de dropout
+        use_batch_norm: Se True, usa BatchNorm (descarta o último batch incompleto)
+        optimizer_name: 'Adam' ou 'RMSprop'
+        learning_rate: Learning rate
+        weight_decay: Regularização L2
+        batch_size: Tamanho do batch
+        max_epochs: Máximo de épocas
+        patience: Paciência do Early Stopping
+        seed: Seed base
+        device: Device (CPU/GPU)
+        tune_threads: Se True (em CPU), ajusta as threads do PyTorch ao
+            StackedMLP dos K folds e as aplica no processo (src/runtime.py,
+            em cache)
+    
+    Returns:
+        Lista (um por fold) de dicts com 'fold', 'train_losses', 'val_losses',
+        'best_val_loss', 'best_epoch' e 'state_dict' (formato de MLP)
+    """
+    K = len(folds)
+    input_dim = folds[0]['X_train'].shape[1]
+    if tune_threads and device.type == 'cpu':
+        runtime.tune_threads(
+            input_dim=input_dim, hidden_dims=hidden_dims, batch_size=batch_size, mode='train',
+            use_batch_norm=use_batch_norm, dropout_rate=dropout_rate, n_models=K, probe_interop=True
+        )
+    
+    models = []
+    for k, fold in enumerate(folds):
+        torch.manual_seed(seed + fold['fold'])
+        models.append(MLP(
+            input_dim=input_dim, hidden_dims=hidden_dims, output_dim=1,
+            dropout_rate=dropout_rate, use_batch_norm=use_batch_norm
+        ))
+    model = StackedMLP.from_models(models).to(device)
+    optimizer = StackedOptimizer(
+        model.parameters(), K, name=optimizer_name, lr=learning_rate, weight_decay=weight_decay
+    )
+    generators = [torch.Generator().manual_seed(seed + fold['fold']) for fold in folds]
+    dropout_generator = torch.Generator(device=device).manual_seed(seed)
+    
+    X_train = _padded([f['X_train'] for f in folds], device)
+    y_train = _padded([f['y_train'] for f in folds], device)
+    X_val = _padded([f['X_val'] for f in folds], device)
+    y_val = _padded([f['y_val'] for f in folds], device)
+    n_train = torch.tensor([len(f['X_train']) for f in folds])
+    n_val = torch.tensor([len(f['X_val']) for f in folds], device=device)
+    pad_idx = X_train.shape[1] - 1
+    rows = torch.arange(K, device=device).unsqueeze(1)
+    
+    if use_batch_norm:
+        n_batches = n_train // batch_size
+    else:
+        n_batches = (n_train + batch_size - 1) // batch_size
+    max_batches = int(n_batches.max())
+    
+    early_stoppings = [EarlyStopping(patience=patience) for _ in range(K)]
+    stopped = torch.zeros(K, dtype=torch.bool)
+    histories = [
+        {'fold': f['fold'], 'train_losses': [], 'val_losses': [],
+         'best_val_loss': float('inf'), 'best_epoch': 0, 'state_dict': None}
+        for f in folds
+    ]
+    
+    for epoch in range(1, max_epochs + 1):
+        # Índices (K, max_batches, B) com padding, mesma ordem do FastTensorLoader
+        idx = torch.full((K, max_batches * batch_size), pad_idx, dtype=torch.long)
+        for k in range(K):
+            perm = torch.randperm(int(n_train[k]), generator=generators[k])
+            n_used = int(n_batches[k]) * batch_size
+            perm = perm[:min(n_used, len(perm))]
+            idx[k, :len(perm)] = perm
+        idx = idx.view(K, max_batches, batch_size).to(device)
+        
+        model.train()
+        loss_sums = torch.zeros(K, device=device)
+        for j in range(max_batches):
+            batch_idx = idx[:, j]
+            mask = batch_idx != pad_idx
+            counts = mask.sum(dim=1)
+            active = (counts > 0).cpu() & ~stopped
+            
+            predictions = model(X_train[rows, batch_idx], mask, dropout_generator).squeeze(-1)
+            sq_err = (predictions - y_train[rows, batch_idx]) ** 2 * mask
+            fold_loss = sq_err.sum(dim=1) / counts.clamp(min=1)
+            
+            optimizer.zero_grad()
+            (fold_loss * active.to(device)).sum().backward()
+            optimizer.step(active)
+            
+            loss_sums += fold_loss.detach() * (counts > 0)
+        
+        train_losses = (loss_sums / n_batches.to(device).clamp(min=1)).tolist()
+        
+        model.eval()
+        with torch.no_grad():
+            val_losses = _batched_val_loss(model, X_val, y_val, n_val, batch_size).tolist()
+        
+        for k in range(K):
+            if stopped[k]:
+                continue
+            history = histories[k]
+            history['train_losses'].append(train_losses[k])
+            history['val_losses'].append(val_losses[k])
+            
+            # Model Checkpointing (cópia real dos tensores do membro)
+            if val_losses[k] < history['best_val_loss']:
+                history['best_val_loss'] = val_losses[k]
+                history['best_epoch'] = epoch
+                history['state_dict'] = model.member_state_dict(k)
+            
+            if early_stoppings[k](val_losses[k]):
+                stopped[k] = True
+        
+        if bool(stopped.all()):
+            break
+    
+    return histories
+
+
+def _log_uniform(rng: np.random.Generator, low: float, high: float, size: int) -> np.ndarray:
+    return np.exp(rng.uniform(np.log(low), np.log(high), size))
+
+
+def train_population(
+    fold: Dict,
+    population_size: int = 64,
+    hidden_dims: List[int] = [64, 32],
+    use_batch_norm: bool = False,
+    optimizer_name: str = 'Adam',
+    batch_size: int = 16,
+    max_epochs: int = 500,
+    patience: int = 50,
+    ready_every: int = 10,
+    exploit_fraction: float = 0.25,
+    perturb_factors: Tuple[float, float] = (0.8, 1.25),
+    learning_rate_range: Tuple[float, float] = (1e-4, 1e-2),
+    weight_decay_range: Tuple[float, float] = (1e-6, 1e-3),
+    dropout_range: Tuple[float, float] = (0.1, 0.5),
+    seed: int = 42,
+    device: torch.device = torch.device('cpu'),
+    tune_threads: bool = True
+) -> Dict:
+    """
+    Population Based Training (PBT) vetorizado sobre um fold.
+    
+    Os P membros da população têm a mesma arquitetura e diferem em learning
+    rate, weight decay e dropout (amostrados nos intervalos dados). Todos
+    ficam em um StackedMLP e veem os mesmos batches: o batch (B, F) é
+    compartilhado e cada passo é um único forward/backward para os P
+    modelos, com hiperparâmetros por membro no StackedOptimizer.
+    
+    A cada ready_every épocas, os membros são ordenados pela loss de
+    validação da época; cada um da fração inferior (exploit_fraction)
+    copia pesos e estado do otimizador de um membro sorteado da fração
+    superior (exploit) e recebe os hiperparâmetros dele multiplicados por
+    um fator sorteado de perturb_factors, limitados aos intervalos (explore).
+    
+    O treino para quando a melhor loss da população não melhora por
+    patience épocas. O checkpoint é o melhor membro em qualquer época, com
+    o cronograma de hiperparâmetros que o levou até lá.
+    
+    Args:
+        fold: Fold de get_kfold_splits
+        population_size: Número de membros (P)
+        hidden_dims: Dimensões das camadas ocultas (comuns à população)
+        use_batch_norm: Se True, usa BatchNorm (descarta o último batch incompleto)
+        optimizer_name: 'Adam' ou 'RMSprop'
+        batch_size: Tamanho do batch (comum à população)
+        max_epochs: Máximo de épocas
+        patience: Paciência do Early Stopping da população
+        ready_every: Intervalo em épocas entre passos de exploit/explore
+        exploit_fraction: Fração substituída (e fração doadora) a cada passo
+        perturb_factors: Fatores multiplicativos do explore
+        learning_rate_range: Intervalo do learning rate (log-uniforme)
+        weight_decay_range: Intervalo do weight decay (log-uniforme)
+        dropout_range: Intervalo do dropout (uniforme)
+        seed: Seed da população, do embaralhamento e do dropout
+        device: Device (CPU/GPU)
+        tune_threads: Se True (em CPU), ajusta as threads do PyTorch ao
+            StackedMLP da população e as aplica no processo (src/runtime.py,
+            em cache)
+    
+    Returns:
+        Dict com 'best_val_loss', 'best_epoch', 'state_dict' (formato de MLP),
+        'hyperparams' e 'schedule' do melhor membro ([(época, hiperparâmetros)]),
+        'val_losses' (melhor loss da população por época), 'n_exploits' e
+        'population' (hiperparâmetros e última loss de cada membro)
+    """
+    P = population_size
+    if tune_threads and device.type == 'cpu':
+        runtime.tune_threads(
+            input_dim=fold['X_train'].shape[1], hidden_dims=hidden_dims, batch_size=batch_size,
+            mode='train', use_batch_norm=use_batch_norm, dropout_rate=float(np.mean(dropout_range)),
+            n_models=P, probe_interop=True
+        )
+    rng = np.random.default_rng(seed)
+    torch.manual_seed(seed)
+    
+    learning_rates = _log_uniform(rng, *learning_rate_range, P)
+    weight_decays = _log_uniform(rng, *weight_decay_range, P)
+    dropout_rates = rng.uniform(*dropout_range, P)
+    
+    model = StackedMLP(
+        P, input_dim=fold['X_train'].shape[1], hidden_dims=hidden_dims, output_dim=1,
+        dropout_rate=dropout_rates.tolist(), use_batch_norm=use_batch_norm
+    ).to(device)
+    optimizer = StackedOptimizer(
+        model.parameters(), P, name=optimizer_name, lr=learning_rates, weight_decay=weight_decays
+    )
+    generator = torch.Generator().manual_seed(seed)
+    dropout_generator = torch.Generator(device=device).manual_seed(seed)
+    
+    X_train = fold['X_train'].to(device).float()
+    y_train = fold['y_train'].to(device).float()
+    X_val = _padded([fold['X_val']], device).expand(P, -1, -1)
+    y_val = _padded([fold['y_val']], device).expand(P, -1)
+    n_val = torch.full((P,), len(fold['X_val']), device=device)
+    n_train = len(X_train)
+    n_batches = n_train // batch_size if use_batch_norm else (n_train + batch_size - 1) // batch_size
+    
+    def hyperparams(k: int) -> Dict[str, float]:
+        return {
+            'learning_rate': float(optimizer.lr[k]),
+            'weight_decay': float(optimizer.weight_decay[k]),
+            'dropout_rate': float(model.dropout_rate[k])
+        }
+    
+    schedules = [[(0, hyperparams(k))] for k in range(P)]
+    early_stopping = EarlyStopping(patience=patience)
+    result = {'best_val_loss': float('inf'), 'best_epoch': 0, 'state_dict': None,
+              'hyperparams': None, 'schedule': None, 'val_losses': [], 'n_exploits': 0}
+    n_exploit = max(1, int(round(P * exploit_fraction))) if P > 1 else 0
+    
+    for epoch in range(1, max_epochs + 1):
+        model.train()
+        perm = torch.randperm(n_train, generator=generator).to(device)
+        for j in range(n_batches):
+            batch_idx = perm[j * batch_size:(j + 1) * batch_size]
+            predictions = model(X_train[batch_idx], generator=dropout_generator).squeeze(-1)
+            member_loss = ((predictions - y_train[batch_idx]) ** 2).mean(dim=1)
+            optimizer.zero_grad()
+            member_loss.sum().backward()
+            optimizer.step()
+        
+        model.eval()
+        with torch.no_grad():
+            val_losses = _batched_val_loss(model, X_val, y_val, n_val, batch_size)
+        best_k = int(torch.argmin(val_losses))
+        best_loss = float(val_losses[best_k])
+        result['val_losses'].append(best_loss)
+        
+        # Checkpoint do melhor membro já visto (antes do exploit sobrescrever pesos)
+        if best_loss < result['best_val_loss']:
+            result.update({
+                'best_val_loss': best_loss,
+                'best_epoch': epoch,
+                'state_dict': model.member_state_dict(best_k),
+                'hyperparams': hyperparams(best_k),
+                'schedule': list(schedules[best_k])
+            })
+        
+        if early_stopping(best_loss):
+            break
+        
+        if n_exploit and epoch % ready_every == 0 and epoch < max_epochs:
+            order = torch.argsort(val_losses).tolist()
+            top, bottom = order[:n_exploit], order[-n_exploit:]
+            for dst in bottom:
+                src = int(rng.choice(top))
+                model.copy_member(src, dst)
+                optimizer.copy_member(src, dst)
+                factors = rng.choice(perturb_factors, size=3)
+                source = hyperparams(src)
+                optimizer.lr[dst] = np.clip(source['learning_rate'] * factors[0], *learning_rate_range)
+                optimizer.weight_decay[dst] = np.clip(source['weight_decay'] * factors[1], *weight_decay_range)
+                model.dropout_rate[dst] = np.clip(source['dropout_rate'] * factors[2], *dropout_range)
+                schedules[dst] = schedules[src] + [(epoch, hyperparams(dst))]
+            result['n_exploits'] += len(bottom)
+    
+    final_losses = val_losses.tolist()
+    result['population'] = [{**hyperparams(k), 'val_loss': final_losses[k]} for k in range(P)]
+    return result
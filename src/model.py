@@ -3,9 +3,14 @@ Módulo de Arquitetura de Redes Neurais
 MLP (Multi-Layer Perceptron) para Regressão
 """
 
+import copy
+import weakref
+import warnings
+import numpy as np
 import torch
 import torch.nn as nn
-from typing import List
+import torch.nn.functional as F
+from typing import List, Tuple, Dict, Callable, Optional
 
 
 class MLP(nn.Module):
@@ -124,9 +129,347 @@ class MLP(nn.Module):
         Returns:
             Output tensor (batch_size, output_dim)
         """
+        compiled = _COMPILED_MODELS.get(self)
+        if compiled is not None:
+            return compiled(x)
         return self.network(x)
     
+    def signature(self) -> Tuple:
+        """
+        Assinatura da arquitetura (chave do cache de compilação)
+        
+        Modelos com a mesma assinatura compartilham o forward compilado,
+        mesmo com pesos ou taxa de dropout diferentes.
+        """
+        return (
+            self.input_dim,
+            tuple(self.hidden_dims),
+            self.network[-1].out_features,
+            self.use_batch_norm,
+            self.dropout_rate > 0.0
+        )
+    
     def count_parameters(self) -> int:
         """Retorna o número total de parâmetros treináveis"""
         return sum(p.numel() for p in self.parameters() if p.requires_grad)
 
+
+
+def _mlp_forward(
+    x: torch.Tensor,
+    weights: List[torch.Tensor],
+    biases: List[torch.Tensor],
+    bn_weights: List[torch.Tensor],
+    bn_biases: List[torch.Tensor],
+    running_means: List[torch.Tensor],
+    running_vars: List[torch.Tensor],
+    dropout_p: torch.Tensor,
+    training: bool,
+    use_batch_norm: bool,
+    use_dropout: bool
+) -> torch.Tensor:
+    """
+    Forward funcional do MLP (mesma sequência de camadas do nn.Sequential)
+    
+    Os pesos e a taxa de dropout entram como argumentos (tensores), para
+    que um único artefato compilado sirva a qualquer modelo de mesma
+    arquitetura sem recompilar.
+    """
+    h = x
+    n_layers = len(weights)
+    for i in range(n_layers - 1):
+        h = F.linear(h, weights[i], biases[i])
+        if use_batch_norm:
+            h = F.batch_norm(
+                h, running_means[i], running_vars[i], bn_weights[i], bn_biases[i],
+                training, 0.1, 1e-5
+            )
+        h = F.relu(h)
+        if use_dropout and training:
+            keep = torch.rand_like(h) >= dropout_p
+            h = h * keep / (1.0 - dropout_p)
+    return F.linear(h, weights[n_layers - 1], biases[n_layers - 1])
+
+
+def _state_roles(state_dict: Dict[str, torch.Tensor]) -> Tuple[List[str], List[str]]:
+    """
+    Agrupa as chaves de um state_dict de MLP por papel, na ordem da rede
+    
+    Os índices do nn.Sequential mudam com BatchNorm/Dropout, então o
+    pareamento entre arquiteturas é feito por papel: camadas Linear (peso
+    2-D) e BatchNorm (peso 1-D), cada uma na ordem em que aparece.
+    
+    Returns:
+        Tupla (prefixos das Linear, prefixos das BatchNorm), ex.: 'network.0'
+    """
+    linears, batch_norms = [], []
+    for key, tensor in state_dict.items():
+        if not key.endswith('.weight'):
+            continue
+        prefix = key[:-len('.weight')]
+        (linears if tensor.dim() == 2 else batch_norms).append(prefix)
+    
+    def order(prefix: str) -> int:
+        index = prefix.rsplit('.', 1)[-1]
+        return int(index) if index.isdigit() else 0
+    
+    return sorted(linears, key=order), sorted(batch_norms, key=order)
+
+
+def load_compatible_state(
+    model: MLP,
+    state_dict: Dict[str, torch.Tensor],
+    partial: bool = True
+) -> Dict[str, List[str]]:
+    """
+    Carrega pesos de um checkpoint compatível (warm start)
+    
+    As camadas são pareadas por papel (i-ésima Linear oculta, i-ésima
+    BatchNorm e camada de saída), não pelo índice no nn.Sequential, então
+    funcionam checkpoints com/sem Dropout ou com profundidade diferente.
+    Tensores de mesma forma são copiados; com partial=True, tensores de
+    formas diferentes recebem o bloco sobreposto (ex.: 64 -> 128 unidades
+    copia as 64 primeiras) e o restante mantém a inicialização Xavier.
+    
+    Args:
+        model: MLP de destino (já inicializado)
+        state_dict: Pesos de origem (state_dict de MLP)
+        partial: Copia o bloco sobreposto de tensores com forma diferente
+        
+    Returns:
+        Dict com listas de chaves de destino 'loaded', 'partial' e 'skipped'
+    """
+    target = model.state_dict()
+    src_linears, src_bns = _state_roles(state_dict)
+    dst_linears, dst_bns = _state_roles(target)
+    
+    # Pares (prefixo origem, prefixo destino): ocultas na ordem, saída com saída
+    pairs = list(zip(src_linears[:-1], dst_linears[:-1])) + list(zip(src_bns, dst_bns))
+    if src_linears and dst_linears:
+        pairs.append((src_linears[-1], dst_linears[-1]))
+    
+    report = {'loaded': [], 'partial': [], 'skipped': []}
+    matched = set()
+    with torch.no_grad():
+        for src_prefix, dst_prefix in pairs:
+            for key, dst in target.items():
+                if not key.startswith(dst_prefix + '.'):
+                    continue
+                src = state_dict.get(src_prefix + key[len(dst_prefix):])
+                if src is None:
+                    continue
+                matched.add(key)
+                if src.shape == dst.shape:
+                    dst.copy_(src)
+                    report['loaded'].append(key)
+                elif partial and src.dim() == dst.dim() and src.dim() > 0:
+                    block = tuple(slice(0, min(a, b)) for a, b in zip(src.shape, dst.shape))
+                    dst[block].copy_(src[block])
+                    report['partial'].append(key)
+                else:
+                    report['skipped'].append(key)
+    report['skipped'].extend(key for key in target if key not in matched)
+    return report
+
+
+class WarmStartRegistry:
+    """
+    Registro de modelos já treinados para warm start de folds e trials
+    
+    Cada entrada guarda fold, arquitetura, hiperparâmetros, loss de
+    validação e pesos. lookup() devolve o checkpoint mais próximo para uma
+    nova configuração: mesma arquitetura (menor loss) primeiro; senão, a
+    arquitetura mais parecida, carregada parcialmente.
+    
+    Por padrão, só reaproveita modelos do MESMO fold (mesma divisão
+    treino/validação, ex.: trials anteriores do Optuna). Com
+    cross_fold=True também usa o fold anterior da mesma configuração, mas
+    esse modelo foi treinado com amostras da validação do fold atual, o que
+    torna a estimativa do K-Fold otimista (data leakage).
+    
+    Exemplo:
+        >>> registry = WarmStartRegistry()
+        >>> objective = KFoldObjective(X, y, warm_start=registry)
+    """
+    
+    def __init__(self, cross_fold: bool = False, max_entries: int = 256):
+        """
+        Args:
+            cross_fold: Permite reaproveitar modelos de outros folds
+            max_entries: Máximo de entradas (as de pior loss são descartadas)
+        """
+        self.cross_fold = cross_fold
+        self.max_entries = max_entries
+        self.entries: List[Dict] = []
+    
+    @staticmethod
+    def _architecture(config: Dict) -> Tuple:
+        return (tuple(config['hidden_dims']), bool(config['use_batch_norm']))
+    
+    def register(self, fold: int, config: Dict, state_dict: Dict[str, torch.Tensor], val_loss: float) -> None:
+        """Registra um modelo treinado (pesos copiados para CPU)"""
+        self.entries.append({
+            'fold': fold,
+            'architecture': self._architecture(config),
+            'val_loss': float(val_loss),
+            'state_dict': {k: v.detach().cpu().clone() for k, v in state_dict.items()}
+        })
+        if len(self.entries) > self.max_entries:
+            self.entries.sort(key=lambda entry: entry['val_loss'])
+            self.entries = self.entries[:self.max_entries]
+    
+    @staticmethod
+    def _distance(a: Tuple, b: Tuple) -> float:
+        """Distância entre arquiteturas (diferença de profundidade e de largura em log2)"""
+        dims_a, dims_b = a[0], b[0]
+        depth = abs(len(dims_a) - len(dims_b))
+        width = sum(abs(np.log2(x) - np.log2(y)) for x, y in zip(dims_a, dims_b))
+        return depth * 10.0 + width + (0.5 if a[1] != b[1] else 0.0)
+    
+    def lookup(self, fold: int, config: Dict) -> Optional[Dict[str, torch.Tensor]]:
+        """
+        Melhor checkpoint para inicializar (fold, config), ou None
+        
+        Args:
+            fold: Fold do novo modelo
+            config: Hiperparâmetros do novo modelo (hidden_dims, use_batch_norm)
+            
+        Returns:
+            state_dict para load_compatible_state, ou None
+        """
+        architecture = self._architecture(config)
+        candidates = [e for e in self.entries if e['fold'] == fold]
+        if not candidates and self.cross_fold:
+            candidates = [e for e in self.entries if e['fold'] < fold] or self.entries
+        if not candidates:
+            return None
+        best = min(candidates, key=lambda e: (self._distance(e['architecture'], architecture), e['val_loss']))
+        return best['state_dict']
+
+
+# Cache de forwards compilados: (assinatura, backend) -> função
+_COMPILED_FORWARDS: Dict[Tuple, Callable] = {}
+
+# Modelos em modo compilado -> _CompiledForward (não impede a coleta do modelo)
+_COMPILED_MODELS: 'weakref.WeakKeyDictionary[MLP, _CompiledForward]' = weakref.WeakKeyDictionary()
+
+COMPILE_BACKENDS = ('compile', 'script', 'eager')
+
+
+class _CompiledForward:
+    """Liga um forward compilado aos parâmetros e buffers atuais de um MLP"""
+    
+    def __init__(self, fn: Callable, model: MLP, backend: str):
+        self.fn = fn
+        self.backend = backend
+        self.model_ref = weakref.ref(model)
+        self.linears = [m for m in model.network if isinstance(m, nn.Linear)]
+        self.batch_norms = [m for m in model.network if isinstance(m, nn.BatchNorm1d)]
+        self.dropout_p = torch.tensor(float(model.dropout_rate))
+    
+    def __call__(self, x: torch.Tensor) -> torch.Tensor:
+        training = self.model_ref().training
+        if self.dropout_p.device != x.device:
+            self.dropout_p = self.dropout_p.to(x.device)
+        if training:
+            for bn in self.batch_norms:
+                bn.num_batches_tracked.add_(1)
+        # Buffers lidos a cada chamada: model.to(device) substitui os tensores
+        return self.fn(
+            x,
+            [m.weight for m in self.linears],
+            [m.bias for m in self.linears],
+            [m.weight for m in self.batch_norms],
+            [m.bias for m in self.batch_norms],
+            [m.running_mean for m in self.batch_norms],
+            [m.running_var for m in self.batch_norms],
+            self.dropout_p,
+            training
+        )
+
+
+def _build_forward(signature: Tuple, backend: str) -> Callable:
+    """Cria (ou reaproveita do cache) o forward da assinatura no backend pedido"""
+    key = (signature, backend)
+    if key in _COMPILED_FORWARDS:
+        return _COMPILED_FORWARDS[key]
+    
+    use_batch_norm, use_dropout = signature[3], signature[4]
+    if backend == 'script':
+        scripted = torch.jit.script(_mlp_forward)
+        
+        def fn(x, w, b, bw, bb, rm, rv, p, training):
+            return scripted(x, w, b, bw, bb, rm, rv, p, training, use_batch_norm, use_dropout)
+    else:
+        def fn(x, w, b, bw, bb, rm, rv, p, training):
+            return _mlp_forward(x, w, b, bw, bb, rm, rv, p, training, use_batch_norm, use_dropout)
+        
+        if backend == 'compile':
+            fn = torch.compile(fn, dynamic=None)
+    
+    _COMPILED_FORWARDS[key] = fn
+    return fn
+
+
+def _smoke_test(fn: Callable, model: MLP, backend: str) -> None:
+    """Executa treino e inferência em uma cópia descartável (erros de compilação aparecem aqui)"""
+    probe = copy.deepcopy(model)
+    _COMPILED_MODELS.pop(probe, None)
+    runner = _CompiledForward(fn, probe, backend)
+    device = next(probe.parameters()).device
+    x = torch.randn(4, probe.input_dim, device=device)
+    
+    probe.train()
+    runner(x).sum().backward()
+    probe.eval()
+    with torch.no_grad():
+        runner(x)
+
+
+def compile_model(model: MLP, backend: str = 'auto') -> str:
+    """
+    Ativa o modo compilado do MLP (opt-in), para treino e inferência
+    
+    Com backend='auto', tenta torch.compile, depois TorchScript e, se ambos
+    falharem (ex.: sem compilador C++ disponível), mantém a execução eager.
+    O artefato compilado fica em cache por assinatura da arquitetura
+    (MLP.signature(): hidden_dims, use_batch_norm, dropout_rate > 0), então
+    trials do Optuna com a mesma forma não recompilam.
+    
+    No modo compilado as máscaras de dropout vêm de torch.rand_like (mesma
+    distribuição de nn.Dropout, outra sequência aleatória).
+    
+    Exemplo:
+        >>> model = MLP(hidden_dims=[64, 32])
+        >>> compile_model(model)   # 'compile', 'script' ou 'eager'
+    
+    Args:
+        model: MLP a compilar
+        backend: 'auto', 'compile', 'script' ou 'eager'
+        
+    Returns:
+        Backend efetivamente usado
+    """
+    candidates = COMPILE_BACKENDS if backend == 'auto' else (backend,)
+    signature = model.signature()
+    
+    for candidate in candidates:
+        if candidate == 'eager':
+            _COMPILED_MODELS.pop(model, None)
+            return 'eager'
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                fn = _build_forward(signature, candidate)
+                _smoke_test(fn, model, candidate)
+        except Exception as e:
+            _COMPILED_FORWARDS.pop((signature, candidate), None)
+            if backend != 'auto':
+                raise
+            print(f"⚠️ Backend '{candidate}' indisponível ({type(e).__name__}), tentando o próximo...")
+            continue
+        _COMPILED_MODELS[model] = _CompiledForward(fn, model, candidate)
+        return candidate
+    
+    _COMPILED_MODELS.pop(model, None)
+    return 'eager'
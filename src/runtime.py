@@ -0,0 +1,408 @@
+"""
+Módulo de Ajuste de Threads do PyTorch
+Escolhe threads intra-op/inter-op por micro-benchmark, com cache por máquina e formato
+"""
+
+import os
+import json
+import time
+import hashlib
+import platform
+import multiprocessing
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Union
+
+import torch
+import torch.nn as nn
+
+from .model import MLP
+
+
+THREAD_CACHE_ENV = 'NEURAL_REGRESSION_THREAD_CACHE'
+DEFAULT_THREAD_CACHE = Path.home() / '.cache' / 'ufrn-neural-regression' / 'threads.json'
+
+
+def available_cores() -> int:
+    """Núcleos disponíveis para o processo (respeita afinidade/cgroups quando possível)"""
+    if hasattr(os, 'sched_getaffinity'):
+        return max(1, len(os.sched_getaffinity(0)))
+    return max(1, os.cpu_count() or 1)
+
+
+def _cpu_name() -> str:
+    try:
+        with open('/proc/cpuinfo') as f:
+            for line in f:
+                if line.startswith('model name'):
+                    return line.split(':', 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or platform.machine()
+
+
+def machine_signature() -> Dict:
+    """Identificação da máquina usada na chave do cache"""
+    return {
+        'cpu': _cpu_name(),
+        'arch': platform.machine(),
+        'cores': available_cores(),
+        'torch': torch.__version__
+    }
+
+
+def thread_candidates(max_threads: int) -> List[int]:
+    """Potências de 2 até max_threads, mais o próprio max_threads"""
+    candidates = []
+    n = 1
+    while n < max_threads:
+        candidates.append(n)
+        n *= 2
+    candidates.append(max_threads)
+    return candidates
+
+
+def _measure(workload: Dict, n_iters: int) -> float:
+    """
+    Tempo por iteração (µs) do workload com as threads atuais
+    
+    Em modo 'train' cada iteração é forward + backward + passo do Adam; em
+    'inference', um forward sem gradiente. Com n_models > 1, o modelo é um
+    StackedMLP (treino vetorizado de src/fused.py). Usa o menor tempo médio
+    de 3 blocos.
+    """
+    torch.manual_seed(0)
+    n_models = workload['n_models']
+    if n_models > 1:
+        from .fused import StackedMLP, StackedOptimizer
+        
+        model = StackedMLP(
+            n_models,
+            input_dim=workload['input_dim'],
+            hidden_dims=workload['hidden_dims'],
+            output_dim=1,
+            dropout_rate=workload['dropout_rate'],
+            use_batch_norm=workload['use_batch_norm']
+        )
+    else:
+        model = MLP(
+            input_dim=workload['input_dim'],
+            hidden_dims=workload['hidden_dims'],
+            output_dim=1,
+            dropout_rate=workload['dropout_rate'],
+            use_batch_norm=workload['use_batch_norm']
+        )
+    # BatchNorm em treino não aceita batch de 1 amostra
+    batch_size = workload['batch_size']
+    if workload['mode'] == 'train' and workload['use_batch_norm']:
+        batch_size = max(batch_size, 2)
+    shape = (n_models, batch_size) if n_models > 1 else (batch_size,)
+    x = torch.randn(*shape, workload['input_dim'])
+    y = torch.randn(*shape, 1)
+    
+    if workload['mode'] == 'train':
+        model.train()
+        if n_models > 1:
+            optimizer = StackedOptimizer(model.parameters(), n_models, name='Adam', lr=1e-3)
+        else:
+            optimizer = torch.optim.Adam(model.parameters(), lr=1e-3)
+        criterion = nn.MSELoss()
+        
+        def iteration() -> None:
+            optimizer.zero_grad()
+            # Soma das perdas por membro: gradientes independentes, como em src/fused.py
+            (criterion(model(x), y) * n_models).backward()
+            optimizer.step()
+    else:
+        model.eval()
+        
+        def iteration() -> None:
+            with torch.no_grad():
+                model(x)
+    
+    for _ in range(max(1, n_iters // 5)):
+        iteration()
+    best = float('inf')
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(n_iters):
+            iteration()
+        best = min(best, (time.perf_counter() - start) / n_iters)
+    return best * 1e6
+
+
+def _fastest(timings: Dict[str, float], tolerance: float = 0.05) -> int:
+    """Menor número de threads, a menos que outro seja mais de 5% mais rápido (evita escolher ruído)"""
+    best = None
+    for n_threads in sorted(timings, key=int):
+        if best is None or timings[n_threads] < timings[best] * (1 - tolerance):
+            best = n_threads
+    return int(best)
+
+
+_probe_barrier = None
+
+
+def _init_probe(intra_op: int, inter_op: Optional[int], barrier) -> None:
+    """Inicializador dos processos de medição (novos: inter-op ainda pode ser definido)"""
+    global _probe_barrier
+    apply_thread_settings({'intra_op': intra_op, 'inter_op': inter_op})
+    _probe_barrier = barrier
+
+
+def _probe(workload: Dict, n_iters: int) -> float:
+    # Todos os processos começam juntos: cada um mede disputando CPU com os demais
+    _probe_barrier.wait()
+    return _measure(workload, n_iters)
+
+
+def _measure_in_workers(
+    workload: Dict,
+    intra_op: int,
+    inter_op: Optional[int],
+    n_iters: int,
+    n_workers: int
+) -> float:
+    """
+    Tempo médio por iteração (µs) em n_workers processos novos ('spawn')
+    medindo ao mesmo tempo, como os workers de run_kfold/run_parallel_search
+    
+    Medir sozinho no processo pai ignora a disputa por núcleos, cache e
+    banda de memória entre os workers, que muda o número ótimo de threads.
+    """
+    context = multiprocessing.get_context('spawn')
+    barrier = context.Barrier(n_workers)
+    with context.Pool(n_workers, initializer=_init_probe, initargs=(intra_op, inter_op, barrier)) as pool:
+        # Com a barreira, cada processo recebe exatamente uma medição
+        timings = pool.starmap(_probe, [(workload, n_iters)] * n_workers, chunksize=1)
+    return sum(timings) / len(timings)
+
+
+def _cache_path(cache_path: Optional[Union[str, Path]]) -> Path:
+    if cache_path is not None:
+        return Path(cache_path)
+    return Path(os.environ.get(THREAD_CACHE_ENV, DEFAULT_THREAD_CACHE))
+
+
+def _load_cache(path: Path) -> Dict:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache(path: Path, cache: Dict) -> None:
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f'.{os.getpid()}.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(cache, f, indent=2, sort_keys=True)
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"⚠️ Não foi possível gravar o cache de threads em {path}: {e}")
+
+
+def apply_thread_settings(settings: Dict) -> None:
+    """
+    Aplica intra-op (sempre) e inter-op (se possível neste processo)
+    
+    O PyTorch só aceita mudar as threads inter-op antes do primeiro trabalho
+    paralelo; depois disso o valor atual é mantido, com um aviso.
+    """
+    torch.set_num_threads(settings['intra_op'])
+    inter_op = settings.get('inter_op')
+    if inter_op is not None and inter_op != torch.get_num_interop_threads():
+        try:
+            torch.set_num_interop_threads(inter_op)
+        except RuntimeError:
+            print(f"⚠️ Threads inter-op já inicializadas ({torch.get_num_interop_threads()}); "
+                  f"mantendo em vez de {inter_op}")
+
+
+def tune_threads(
+    input_dim: int = 13,
+    hidden_dims: Sequence[int] = (64, 32),
+    batch_size: int = 16,
+    mode: str = 'train',
+    use_batch_norm: bool = False,
+    dropout_rate: float = 0.3,
+    n_models: int = 1,
+    n_workers: int = 1,
+    candidates: Optional[Sequence[int]] = None,
+    probe_interop: bool = False,
+    interop_candidates: Optional[Sequence[int]] = None,
+    n_iters: int = 200,
+    cache_path: Optional[Union[str, Path]] = None,
+    apply: bool = True
+) -> Dict:
+    """
+    Escolhe o número de threads do PyTorch para um MLP pequeno por micro-benchmark
+    
+    Para matmuls de 13 a 64 colunas, usar todos os núcleos costuma ser mais
+    lento que 1 ou 2 threads (o custo de sincronização domina). O tempo por
+    iteração é medido para cada candidato intra-op; com probe_interop, os
+    candidatos inter-op são medidos em processos novos ('spawn'), pois o
+    PyTorch não permite mudá-los depois de iniciados. Com n_workers > 1, cada
+    medição roda em n_workers processos simultâneos, com a mesma disputa por
+    núcleos dos workers que vão treinar. O resultado fica em cache (JSON) por
+    máquina, formato do workload e número de workers: a partir da segunda
+    chamada não há medição.
+    
+    Exemplo:
+        >>> settings = tune_threads(hidden_dims=[64, 32], batch_size=16, mode='train')
+        >>> settings['intra_op'], settings['timings']
+    
+    Args:
+        input_dim: Número de features de entrada
+        hidden_dims: Dimensões das camadas ocultas
+        batch_size: Tamanho do batch
+        mode: 'train' (forward + backward + Adam) ou 'inference' (forward sem gradiente)
+        use_batch_norm: Se True, o MLP medido usa BatchNorm
+        dropout_rate: Taxa de dropout do MLP medido
+        n_models: Modelos treinados juntos (> 1 mede um StackedMLP, como em
+            train_folds_fused e train_population)
+        n_workers: Processos que vão treinar em paralelo (medidos juntos)
+        candidates: Threads intra-op a testar (padrão: potências de 2 até os
+            núcleos disponíveis / n_workers)
+        probe_interop: Se True, mede também as threads inter-op em subprocessos
+        interop_candidates: Threads inter-op a testar (padrão: 1 e os núcleos
+            disponíveis / n_workers)
+        n_iters: Iterações por bloco de medição
+        cache_path: Arquivo JSON do cache (padrão: $NEURAL_REGRESSION_THREAD_CACHE
+            ou ~/.cache/ufrn-neural-regression/threads.json)
+        apply: Se True, aplica a escolha no processo atual
+    
+    Returns:
+        Dict com 'intra_op', 'inter_op' (None se não medido), 'timings'
+        (µs por iteração de cada candidato intra-op) e 'cached'
+    """
+    if mode not in ('train', 'inference'):
+        raise ValueError(f"Modo inválido: {mode} (use 'train' ou 'inference')")
+    n_workers = max(1, int(n_workers))
+    worker_cores = max(1, available_cores() // n_workers)
+    candidates = sorted(set(candidates)) if candidates is not None else thread_candidates(worker_cores)
+    workload = {
+        'input_dim': int(input_dim),
+        'hidden_dims': [int(h) for h in hidden_dims],
+        'batch_size': int(batch_size),
+        'mode': mode,
+        'use_batch_norm': bool(use_batch_norm),
+        'dropout_rate': float(dropout_rate),
+        'n_models': max(1, int(n_models))
+    }
+    
+    key_payload = {'machine': machine_signature(), 'workload': workload, 'n_workers': n_workers,
+                   'candidates': candidates, 'probe_interop': probe_interop}
+    key = hashlib.sha256(json.dumps(key_payload, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+    path = _cache_path(cache_path)
+    cache = _load_cache(path)
+    
+    if key in cache:
+        settings = {**cache[key], 'cached': True}
+    else:
+        previous_threads = torch.get_num_threads()
+        timings = {}
+        try:
+            if len(candidates) > 1:
+                for n_threads in candidates:
+                    if n_workers > 1:
+                        timings[str(n_threads)] = _measure_in_workers(workload, n_threads, None, n_iters, n_workers)
+                    else:
+                        torch.set_num_threads(n_threads)
+                        timings[str(n_threads)] = _measure(workload, n_iters)
+            else:
+                timings[str(candidates[0])] = None
+        finally:
+            torch.set_num_threads(previous_threads)
+        intra_op = _fastest(timings) if len(candidates) > 1 else candidates[0]
+        
+        inter_op = None
+        interop_timings = {}
+        if probe_interop:
+            interop_candidates = sorted(set(interop_candidates or (1, worker_cores)))
+            if len(interop_candidates) > 1:
+                for n_interop in interop_candidates:
+                    interop_timings[str(n_interop)] = _measure_in_workers(
+                        workload, intra_op, n_interop, n_iters, n_workers
+                    )
+                inter_op = _fastest(interop_timings)
+            else:
+                inter_op = interop_candidates[0]
+        
+        settings = {
+            'intra_op': intra_op,
+            'inter_op': inter_op,
+            'timings': timings,
+            'interop_timings': interop_timings,
+            'workload': workload,
+            'n_workers': n_workers
+        }
+        cache[key] = settings
+        _save_cache(path, cache)
+        settings = {**settings, 'cached': False}
+        if len(candidates) > 1 or interop_timings:
+            print(f"🧵 Threads ({mode}, batch {batch_size}"
+                  + (f", {n_models} modelos" if n_models > 1 else "")
+                  + (f", {n_workers} workers" if n_workers > 1 else "")
+                  + f"): intra-op={intra_op}"
+                  + (f", inter-op={inter_op}" if inter_op is not None else "")
+                  + " | µs/iteração: " + ", ".join(f"{n}={t:.0f}" for n, t in timings.items() if t is not None)
+                  + ("; inter-op " + ", ".join(f"{n}={t:.0f}" for n, t in interop_timings.items())
+                     if interop_timings else ""))
+    
+    if apply:
+        apply_thread_settings(settings)
+    return settings
+
+
+def tune_threads_for_model(
+    model: nn.Module,
+    batch_size: int = 1,
+    mode: str = 'inference',
+    **kwargs
+) -> Dict:
+    """
+    tune_threads com a arquitetura de um MLP já construído (ex.: o modelo do app)
+    
+    Args:
+        model: MLP (usa input_dim, hidden_dims, use_batch_norm e dropout_rate)
+        batch_size: Tamanho do batch (1 = predição individual)
+        mode: 'inference' ou 'train'
+        **kwargs: Demais argumentos de tune_threads
+    
+    Returns:
+        Configuração escolhida (ver tune_threads)
+    """
+    return tune_threads(
+        input_dim=model.input_dim,
+        hidden_dims=model.hidden_dims,
+        batch_size=batch_size,
+        mode=mode,
+        use_batch_norm=model.use_batch_norm,
+        dropout_rate=model.dropout_rate,
+        **kwargs
+    )
+
+
+def tune_threads_for_config(input_dim: int, config: Dict, mode: str = 'train', **kwargs) -> Dict:
+    """
+    tune_threads com o MLP e o batch de um config de treino (chaves de DEFAULT_CONFIG)
+    
+    Args:
+        input_dim: Número de features de entrada
+        config: Config com hidden_dims, batch_size, use_batch_norm e dropout_rate
+        mode: 'train' ou 'inference'
+        **kwargs: Demais argumentos de tune_threads (ex.: n_workers, probe_interop)
+    
+    Returns:
+        Configuração escolhida (ver tune_threads)
+    """
+    return tune_threads(
+        input_dim=input_dim,
+        hidden_dims=config['hidden_dims'],
+        batch_size=config['batch_size'],
+        mode=mode,
+        use_batch_norm=config['use_batch_norm'],
+        dropout_rate=config['dropout_rate'],
+        **kwargs
+    )
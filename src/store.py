@@ -0,0 +1,281 @@
+"""
+Módulo de Armazenamento Incremental
+Base append-only com estatísticas online (Welford) para normalização
+"""
+
+import os
+import json
+from pathlib import Path
+import numpy as np
+from typing import Optional, Iterator, Union
+
+from .dataset import BOSTON_COLUMNS, BostonDataset, BostonIterableDataset
+
+
+class RunningStats:
+    """
+    Média e variância online (algoritmo de Welford, com a fórmula de combinação
+    de Chan et al. para blocos).
+    
+    Cada bloco é resumido de forma vetorizada (contagem, média, soma dos
+    quadrados dos desvios) e combinado ao estado atual em O(n_features), sem
+    revisitar os dados anteriores. A variância é a populacional (ddof=0), a
+    mesma do StandardScaler.
+    
+    Exemplo:
+        >>> stats = RunningStats(n_features=13)
+        >>> stats.update(X_block_1)
+        >>> stats.update(X_block_2)
+        >>> X_scaled = (X - stats.mean) / stats.std
+    """
+    
+    def __init__(self, n_features: int):
+        """
+        Args:
+            n_features: Número de colunas acompanhadas
+        """
+        self.n_features = n_features
+        self.count = 0
+        self.mean = np.zeros(n_features, dtype=np.float64)
+        self.m2 = np.zeros(n_features, dtype=np.float64)
+    
+    def update(self, block: np.ndarray) -> 'RunningStats':
+        """
+        Incorpora um bloco de linhas (n, n_features).
+        
+        Args:
+            block: Novas linhas
+        
+        Returns:
+            self (para encadeamento)
+        """
+        block = np.asarray(block, dtype=np.float64).reshape(-1, self.n_features)
+        n_b = len(block)
+        if n_b == 0:
+            return self
+        
+        mean_b = block.mean(axis=0)
+        m2_b = ((block - mean_b) ** 2).sum(axis=0)
+        return self._combine(n_b, mean_b, m2_b)
+    
+    def merge(self, other: 'RunningStats') -> 'RunningStats':
+        """Combina com estatísticas calculadas em paralelo sobre outros dados"""
+        if other.n_features != self.n_features:
+            raise ValueError(f"n_features incompatível: {self.n_features} vs {other.n_features}")
+        if other.count == 0:
+            return self
+        return self._combine(other.count, other.mean, other.m2)
+    
+    def _combine(self, n_b: int, mean_b: np.ndarray, m2_b: np.ndarray) -> 'RunningStats':
+        n_a = self.count
+        n = n_a + n_b
+        delta = mean_b - self.mean
+        self.mean = self.mean + delta * (n_b / n)
+        self.m2 = self.m2 + m2_b + delta ** 2 * (n_a * n_b / n)
+        self.count = n
+        return self
+    
+    @property
+    def var(self) -> np.ndarray:
+        """Variância populacional (ddof=0)"""
+        if self.count == 0:
+            return np.zeros(self.n_features, dtype=np.float64)
+        return self.m2 / self.count
+    
+    @property
+    def std(self) -> np.ndarray:
+        """Desvio padrão, com 1.0 em colunas constantes (como o StandardScaler)"""
+        std = np.sqrt(self.var)
+        std[std == 0.0] = 1.0
+        return std
+    
+    def subset(self, n_columns: int) -> 'RunningStats':
+        """Estatísticas apenas das n_columns primeiras colunas (ex.: só as features)"""
+        stats = RunningStats(n_columns)
+        stats.count = self.count
+        stats.mean = self.mean[:n_columns].copy()
+        stats.m2 = self.m2[:n_columns].copy()
+        return stats
+    
+    def to_scaler(self):
+        """
+        Converte para um StandardScaler já ajustado (mesma API usada no treino
+        e em streamlit_app/utils/preprocessor.py).
+        """
+        from sklearn.preprocessing import StandardScaler
+        
+        scaler = StandardScaler()
+        scaler.mean_ = self.mean.copy()
+        scaler.var_ = self.var.copy()
+        scaler.scale_ = self.std.copy()
+        scaler.n_samples_seen_ = self.count
+        scaler.n_features_in_ = self.n_features
+        return scaler
+    
+    def to_dict(self) -> dict:
+        return {
+            'n_features': self.n_features,
+            'count': self.count,
+            'mean': self.mean.tolist(),
+            'm2': self.m2.tolist(),
+        }
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> 'RunningStats':
+        stats = cls(data['n_features'])
+        stats.count = int(data['count'])
+        stats.mean = np.asarray(data['mean'], dtype=np.float64)
+        stats.m2 = np.asarray(data['m2'], dtype=np.float64)
+        return stats
+    
+    def save(self, path: Union[str, Path]) -> None:
+        """Salva em JSON (escrita atômica)"""
+        path = Path(path)
+        tmp = path.with_suffix(f'.{os.getpid()}.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(tmp, path)
+    
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> 'RunningStats':
+        """Carrega estatísticas salvas com save()"""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+
+class IncrementalBostonStore:
+    """
+    Base de dados incremental (append-only) para o Boston Housing.
+    
+    As linhas (13 features + MEDV) são gravadas em um arquivo binário float32
+    e as estatísticas de todas as colunas são atualizadas online a cada
+    append, sem reler a base. Treino e inferência obtêm média/desvio
+    atuais diretamente das estatísticas persistidas.
+    
+    Layout do diretório:
+        data.f32    -> linhas (N, 14) em float32, concatenadas
+        stats.json  -> RunningStats das 14 colunas
+    
+    Exemplo:
+        >>> store = IncrementalBostonStore('data/store')
+        >>> store.append(novas_vendas)            # (n, 14)
+        >>> train_ds = store.dataset()             # normalizado com as stats atuais
+        >>> store.feature_stats.save('streamlit_app/assets/running_stats.json')
+    """
+    
+    DATA_FILE = 'data.f32'
+    STATS_FILE = 'stats.json'
+    
+    def __init__(self, root: Union[str, Path], n_columns: int = len(BOSTON_COLUMNS)):
+        """
+        Args:
+            root: Diretório da base (criado se não existir)
+            n_columns: Colunas por linha (13 features + 1 target)
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.n_columns = n_columns
+        self.data_path = self.root / self.DATA_FILE
+        self.stats_path = self.root / self.STATS_FILE
+        
+        if self.stats_path.exists():
+            self.stats = RunningStats.load(self.stats_path)
+        else:
+            self.stats = RunningStats(n_columns)
+        
+        self._recover()
+    
+    def _recover(self) -> None:
+        """
+        Deixa dados e estatísticas consistentes após um append interrompido.
+        
+        Uma linha gravada pela metade é truncada (senão o próximo append em
+        modo 'ab' ficaria desalinhado). Se há mais linhas que as contadas em
+        stats.json, só as excedentes são incorporadas; se há menos (ou as
+        estatísticas não batem com a base), elas são recalculadas do zero.
+        """
+        row_bytes = self.n_columns * np.dtype(np.float32).itemsize
+        size = self.data_path.stat().st_size if self.data_path.exists() else 0
+        if size % row_bytes:
+            print(f"⚠️ Linha incompleta no fim de {self.data_path} ({size % row_bytes} bytes); truncando")
+            with open(self.data_path, 'r+b') as f:
+                f.truncate(size - size % row_bytes)
+                f.flush()
+                os.fsync(f.fileno())
+        
+        n_rows = len(self)
+        if n_rows == self.stats.count and self.stats.n_features == self.n_columns:
+            return
+        if n_rows > self.stats.count and self.stats.n_features == self.n_columns:
+            self.stats.update(self.as_array()[self.stats.count:n_rows])
+        else:
+            print(f"⚠️ Estatísticas de {self.stats_path} inconsistentes com a base; recalculando")
+            self.stats = RunningStats(self.n_columns)
+            for block in self.iter_blocks():
+                self.stats.update(block)
+        self.stats.save(self.stats_path)
+    
+    def __len__(self) -> int:
+        if not self.data_path.exists():
+            return 0
+        row_bytes = self.n_columns * np.dtype(np.float32).itemsize
+        return self.data_path.stat().st_size // row_bytes
+    
+    def append(self, block: np.ndarray) -> int:
+        """
+        Acrescenta linhas à base e atualiza as estatísticas.
+        
+        Args:
+            block: Linhas (n, 14) com features e MEDV
+        
+        Returns:
+            Número total de linhas após o append
+        """
+        block = np.asarray(block)
+        if block.ndim != 2 or block.shape[1] != self.n_columns:
+            raise ValueError(f"Esperado bloco (n, {self.n_columns}), recebido {block.shape}")
+        
+        with open(self.data_path, 'ab') as f:
+            f.write(np.ascontiguousarray(block, dtype=np.float32).tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        
+        # Estatísticas sobre os valores efetivamente gravados (float32)
+        self.stats.update(block.astype(np.float32))
+        self.stats.save(self.stats_path)
+        return self.stats.count
+    
+    def as_array(self) -> np.ndarray:
+        """Base inteira como memmap (N, 14) copy-on-write, sem leitura prévia"""
+        n_rows = len(self)
+        if n_rows == 0:
+            return np.empty((0, self.n_columns), dtype=np.float32)
+        return np.memmap(self.data_path, dtype=np.float32, mode='c', shape=(n_rows, self.n_columns))
+    
+    def iter_blocks(self, block_rows: int = 65536) -> Iterator[np.ndarray]:
+        """Itera a base em blocos de block_rows linhas"""
+        data = self.as_array()
+        for start in range(0, len(data), block_rows):
+            yield data[start:start + block_rows]
+    
+    @property
+    def feature_stats(self) -> RunningStats:
+        """Estatísticas atuais das features (sem a coluna MEDV)"""
+        return self.stats.subset(self.n_columns - 1)
+    
+    def dataset(self, indices: Optional[np.ndarray] = None) -> BostonDataset:
+        """
+        BostonDataset sobre o memmap da base, normalizado com as estatísticas
+        atuais (sem cópia nem novo ajuste de scaler).
+        
+        Para validação cruzada sem data leakage, ajustar a normalização apenas
+        no treino de cada fold (get_kfold_splits).
+        """
+        data = self.as_array()
+        stats = self.feature_stats
+        return BostonDataset(data[:, :-1], data[:, -1], indices=indices, mean=stats.mean, std=stats.std)
+    
+    def iterable_dataset(self, **kwargs) -> BostonIterableDataset:
+        """BostonIterableDataset em streaming sobre a base, já normalizado"""
+        stats = self.feature_stats
+        return BostonIterableDataset(self.as_array(), mean=stats.mean, std=stats.std, **kwargs)
@@ -3,53 +3,138 @@ Módulo de Treinamento e Validação
 Loops de treino com Early Stopping
 """
 
+import os
+import json
+import math
+import queue
+import random
+import hashlib
+import threading
+import multiprocessing
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
 import torch
 import torch.nn as nn
 from torch.utils.data import DataLoader
-from typing import Tuple, Dict
+from typing import Tuple, Dict, List, Optional, Iterable, Callable, Union
 import numpy as np
 
 
+def autocast_context(device: torch.device, autocast_dtype: Optional[Union[str, torch.dtype]] = None):
+    """
+    Contexto de precisão mista (torch.autocast) para forward e loss
+    
+    Os pesos continuam em float32 (master weights); apenas as operações
+    elegíveis (ex.: matmul das camadas Linear) rodam em autocast_dtype.
+    
+    Args:
+        device: Device das operações
+        autocast_dtype: torch.bfloat16 / 'bfloat16' (ou float16 em GPU); None desativa
+    
+    Returns:
+        Context manager (inativo quando autocast_dtype é None)
+    """
+    if isinstance(autocast_dtype, str):
+        autocast_dtype = getattr(torch, autocast_dtype)
+    return torch.autocast(
+        device_type=device.type,
+        dtype=autocast_dtype if autocast_dtype is not None else torch.bfloat16,
+        enabled=autocast_dtype is not None
+    )
+
+
+# Configuração padrão do K-Fold (mesmas chaves do CONFIG do notebook)
+DEFAULT_CONFIG = {
+    'seed': 42,
+    'k_folds': 5,
+    'batch_size': 16,
+    'learning_rate': 1e-3,
+    'max_epochs': 500,
+    'patience': 20,
+    'hidden_dims': [64, 32],
+    'dropout_rate': 0.3,
+    'weight_decay': 1e-4,
+    'use_batch_norm': False,
+    'optimizer': 'Adam',
+    'accumulate_on_device': False,
+    'compile_backend': None,
+    'autocast_dtype': None,
+    'checkpoint_dir': None,
+    'checkpoint_top_k': 1,
+    'snapshot_dir': None,
+    'snapshot_every': 10,
+    'tune_threads': True,
+}
+
+# Chaves que não mudam o treino (não entram na chave dos snapshots)
+_SNAPSHOT_IGNORED_KEYS = ('checkpoint_dir', 'checkpoint_top_k', 'snapshot_dir', 'snapshot_every', 'tune_threads')
+
+
 def train_epoch(
     model: nn.Module,
     dataloader: DataLoader,
     criterion: nn.Module,
     optimizer: torch.optim.Optimizer,
-    device: torch.device
+    device: torch.device,
+    accumulate_on_device: bool = False,
+    autocast_dtype: Optional[Union[str, torch.dtype]] = None
 ) -> float:
     """
     Executa uma época de treinamento
     
+    Aceita targets (B,) ou já no formato (B, 1) (ex.: FastTensorLoader em
+    modo residente); batches já no device não são copiados.
+    
+    Com accumulate_on_device=True, a soma das perdas (ponderada pelo tamanho
+    de cada batch) e a contagem de amostras ficam em um tensor no device, e
+    a conversão para float acontece uma única vez, ao final da época (sem
+    loss.item() por batch). O resultado é a média por amostra, correta
+    mesmo com o último batch incompleto; no modo padrão é a média das
+    médias de cada batch.
+    
     Args:
         model: Modelo neural
         dataloader: DataLoader de treino
-        criterion: Função de perda
+        criterion: Função de perda (redução 'mean')
         optimizer: Otimizador
         device: Device (CPU/GPU)
-        
+        accumulate_on_device: Acumula a perda no device, sem sincronizar por batch
+        autocast_dtype: Precisão mista no forward/loss (ex.: 'bfloat16'); None = float32
+    
     Returns:
         Loss médio da época
     """
     model.train()
     total_loss = 0.0
     n_batches = 0
+    loss_sum = torch.zeros((), device=device) if accumulate_on_device else None
+    n_samples = 0
     
     for X_batch, y_batch in dataloader:
         X_batch = X_batch.to(device)
-        y_batch = y_batch.to(device).unsqueeze(1)
+        y_batch = y_batch.to(device)
+        if y_batch.dim() == 1:
+            y_batch = y_batch.unsqueeze(1)
         
         # Forward pass
-        predictions = model(X_batch)
-        loss = criterion(predictions, y_batch)
+        with autocast_context(device, autocast_dtype):
+            predictions = model(X_batch)
+            loss = criterion(predictions, y_batch)
         
         # Backward pass
         optimizer.zero_grad()
         loss.backward()
         optimizer.step()
         
-        total_loss += loss.item()
-        n_batches += 1
+        if accumulate_on_device:
+            loss_sum += loss.detach() * len(X_batch)
+            n_samples += len(X_batch)
+        else:
+            total_loss += loss.item()
+            n_batches += 1
     
+    if accumulate_on_device:
+        return (loss_sum / n_samples).item()
     return total_loss / n_batches
 
 
@@ -57,7 +142,9 @@ def validate_epoch(
     model: nn.Module,
     dataloader: DataLoader,
     criterion: nn.Module,
-    device: torch.device
+    device: torch.device,
+    accumulate_on_device: bool = False,
+    autocast_dtype: Optional[Union[str, torch.dtype]] = None
 ) -> float:
     """
     Executa validação (sem gradientes)
@@ -65,30 +152,97 @@ def validate_epoch(
     Args:
         model: Modelo neural
         dataloader: DataLoader de validação
-        criterion: Função de perda
+        criterion: Função de perda (redução 'mean')
         device: Device (CPU/GPU)
-        
+        accumulate_on_device: Acumula a perda no device e retorna a média
+            por amostra (ver train_epoch)
+        autocast_dtype: Precisão mista no forward/loss (ver train_epoch)
+    
     Returns:
         Loss médio da validação
     """
     model.eval()
     total_loss = 0.0
     n_batches = 0
+    loss_sum = torch.zeros((), device=device) if accumulate_on_device else None
+    n_samples = 0
     
     with torch.no_grad():
         for X_batch, y_batch in dataloader:
             X_batch = X_batch.to(device)
-            y_batch = y_batch.to(device).unsqueeze(1)
+            y_batch = y_batch.to(device)
+            if y_batch.dim() == 1:
+                y_batch = y_batch.unsqueeze(1)
             
-            predictions = model(X_batch)
-            loss = criterion(predictions, y_batch)
+            with autocast_context(device, autocast_dtype):
+                predictions = model(X_batch)
+                loss = criterion(predictions, y_batch)
             
-            total_loss += loss.item()
-            n_batches += 1
+            if accumulate_on_device:
+                loss_sum += loss * len(X_batch)
+                n_samples += len(X_batch)
+            else:
+                total_loss += loss.item()
+                n_batches += 1
     
+    if accumulate_on_device:
+        return (loss_sum / n_samples).item()
     return total_loss / n_batches
 
 
+def train_epoch_lbfgs(
+    model: nn.Module,
+    X: torch.Tensor,
+    y: torch.Tensor,
+    criterion: nn.Module,
+    optimizer: torch.optim.LBFGS,
+    dropout_seed: Optional[int] = None
+) -> float:
+    """
+    Executa uma "época" de L-BFGS: um passo sobre o conjunto de treino inteiro
+    
+    O L-BFGS reavalia o closure várias vezes por passo (iterações internas e
+    busca em linha), então a função precisa ser determinística: as máscaras
+    de dropout são fixadas por passo com fork_rng + dropout_seed. O weight
+    decay do param_group (ver build_optimizer) entra como penalidade L2
+    0.5 * wd * ||w||² no closure, com o mesmo gradiente do Adam/RMSprop.
+    
+    Args:
+        model: Modelo neural
+        X: Features do treino completo (no device)
+        y: Targets do treino completo (no device)
+        criterion: Função de perda
+        optimizer: torch.optim.LBFGS
+        dropout_seed: Seed das máscaras de dropout deste passo (opcional)
+    
+    Returns:
+        Loss de treino (sem a penalidade L2) no início do passo
+    """
+    model.train()
+    group = optimizer.param_groups[0]
+    weight_decay = group.get('weight_decay', 0.0)
+    if y.dim() == 1:
+        y = y.unsqueeze(1)
+    rng_devices = [X.device] if X.device.type == 'cuda' else []
+    data_losses = []
+    
+    def closure() -> torch.Tensor:
+        optimizer.zero_grad()
+        with torch.random.fork_rng(devices=rng_devices, enabled=dropout_seed is not None):
+            if dropout_seed is not None:
+                torch.manual_seed(dropout_seed)
+            predictions = model(X)
+        loss = criterion(predictions, y)
+        data_losses.append(loss.detach())
+        if weight_decay:
+            loss = loss + 0.5 * weight_decay * sum(p.pow(2).sum() for p in group['params'])
+        loss.backward()
+        return loss
+    
+    optimizer.step(closure)
+    return data_losses[0].item()
+
+
 class EarlyStopping:
     """
     Implementação de Early Stopping para prevenir Overfitting
@@ -112,7 +266,7 @@ class EarlyStopping:
         
         Args:
             val_loss: Loss de validação atual
-            
+        
         Returns:
             True se deve parar, False caso contrário
         """
@@ -127,12 +281,259 @@ class EarlyStopping:
             self.counter = 0
         
         return self.early_stop
+    
+    def state_dict(self) -> Dict:
+        """Estado do contador (para retomar o treino)"""
+        return {
+            'patience': self.patience,
+            'min_delta': self.min_delta,
+            'counter': self.counter,
+            'best_loss': self.best_loss,
+            'early_stop': self.early_stop
+        }
+    
+    def load_state_dict(self, state: Dict) -> None:
+        """Restaura o estado salvo por state_dict()"""
+        for key in ('patience', 'min_delta', 'counter', 'best_loss', 'early_stop'):
+            setattr(self, key, state[key])
+
+
+class CheckpointManager:
+    """
+    Snapshots dos melhores pesos com cópia real e gravação assíncrona em disco
+    
+    Cada snapshot é copiado para buffers planos pré-alocados (um por dtype,
+    no device do modelo), com uma única cópia por dtype, em vez de um
+    state_dict().copy() raso que continuaria apontando para os tensores
+    em treino. São mantidos os top_k melhores snapshots; com save_dir, cada
+    novo snapshot é gravado em .pth por uma thread em segundo plano (o
+    treino nunca espera o disco) e os arquivos que saem do top-k são
+    removidos. O melhor também é gravado em '<prefix>_best.pth', no
+    formato de checkpoint lido por streamlit_app/utils/model_loader.py.
+    
+    Exemplo:
+        >>> with CheckpointManager(model, top_k=3, save_dir='models/run1') as ckpt:
+        ...     for epoch in range(1, max_epochs + 1):
+        ...         val_loss = ...
+        ...         ckpt.update(val_loss, epoch)
+        ...     ckpt.restore_best()
+    """
+    
+    def __init__(
+        self,
+        model: nn.Module,
+        top_k: int = 1,
+        save_dir: Optional[str] = None,
+        prefix: str = 'checkpoint',
+        metadata: Optional[Dict] = None
+    ):
+        """
+        Args:
+            model: Modelo monitorado
+            top_k: Número de snapshots mantidos (em memória e em disco)
+            save_dir: Diretório dos .pth (None = apenas em memória)
+            prefix: Prefixo dos arquivos
+            metadata: Campos extras gravados em cada checkpoint (ex.: config, fold)
+        """
+        self.model = model
+        self.top_k = top_k
+        self.prefix = prefix
+        self.metadata = metadata or {}
+        self.save_dir = Path(save_dir) if save_dir is not None else None
+        
+        # Layout plano do state_dict: por dtype, (nome, shape, offset, numel)
+        state = model.state_dict()
+        self._layout: Dict[torch.dtype, List[Tuple[str, torch.Size, int, int]]] = {}
+        sizes: Dict[torch.dtype, int] = {}
+        for name, tensor in state.items():
+            offset = sizes.get(tensor.dtype, 0)
+            self._layout.setdefault(tensor.dtype, []).append((name, tensor.shape, offset, tensor.numel()))
+            sizes[tensor.dtype] = offset + tensor.numel()
+        self._names = list(state.keys())
+        
+        device = next(iter(state.values())).device if state else torch.device('cpu')
+        self._slots = [
+            {dtype: torch.empty(size, dtype=dtype, device=device) for dtype, size in sizes.items()}
+            for _ in range(top_k)
+        ]
+        # Entradas ocupadas: (val_loss, epoch, índice do slot, caminho do .pth)
+        self.entries: List[Tuple[float, int, int, Optional[Path]]] = []
+        
+        self._queue: Optional[queue.Queue] = None
+        self._writer: Optional[threading.Thread] = None
+        self._error: Optional[BaseException] = None
+        if self.save_dir is not None:
+            self.save_dir.mkdir(parents=True, exist_ok=True)
+            self._queue = queue.Queue()
+            self._writer = threading.Thread(target=self._write_loop, name='checkpoint-writer', daemon=True)
+            self._writer.start()
+    
+    @property
+    def best_loss(self) -> float:
+        return self.entries[0][0] if self.entries else float('inf')
+    
+    @property
+    def best_epoch(self) -> int:
+        return self.entries[0][1] if self.entries else 0
+    
+    def _snapshot(self, slot: Dict[torch.dtype, torch.Tensor]) -> None:
+        """Copia o estado atual do modelo para um slot (uma cópia por dtype)"""
+        state = self.model.state_dict()
+        with torch.no_grad():
+            for dtype, entries in self._layout.items():
+                torch.cat([state[name].detach().reshape(-1) for name, _, _, _ in entries], out=slot[dtype])
+    
+    def _unflatten(self, slot: Dict[torch.dtype, torch.Tensor], device: Optional[torch.device] = None) -> Dict[str, torch.Tensor]:
+        """state_dict (cópia independente) a partir de um slot"""
+        views = {}
+        for dtype, entries in self._layout.items():
+            buffer = slot[dtype].to(device, copy=True) if device is not None else slot[dtype].clone()
+            for name, shape, offset, numel in entries:
+                views[name] = buffer[offset:offset + numel].view(shape)
+        return {name: views[name] for name in self._names}
+    
+    def _checkpoint_payload(self, state_dict: Dict[str, torch.Tensor], val_loss: float, epoch: int) -> Dict:
+        payload = {'model_state_dict': state_dict, 'val_loss': val_loss, 'epoch': epoch, **self.metadata}
+        if all(hasattr(self.model, attr) for attr in ('input_dim', 'hidden_dims', 'dropout_rate', 'use_batch_norm')):
+            payload.setdefault('architecture', {
+                'input_dim': self.model.input_dim,
+                'hidden_dims': list(self.model.hidden_dims),
+                'output_dim': 1,
+                'dropout_rate': self.model.dropout_rate,
+                'use_batch_norm': self.model.use_batch_norm
+            })
+        return payload
+    
+    def update(self, val_loss: float, epoch: int) -> bool:
+        """
+        Registra a época; copia os pesos se ela entrar no top-k
+        
+        Args:
+            val_loss: Loss de validação da época
+            epoch: Número da época
+        
+        Returns:
+            True se é o novo melhor snapshot (False para loss NaN/infinita)
+        """
+        # Época divergente nunca entra no top-k (NaN também quebraria a ordenação)
+        if not math.isfinite(val_loss):
+            return False
+        if len(self.entries) == self.top_k and val_loss >= self.entries[-1][0]:
+            return False
+        
+        if len(self.entries) < self.top_k:
+            slot_idx = len(self.entries)
+        else:
+            _, _, slot_idx, evicted_path = self.entries.pop()
+            if evicted_path is not None:
+                self._queue.put(('delete', evicted_path, None))
+        
+        self._snapshot(self._slots[slot_idx])
+        
+        path = None
+        if self.save_dir is not None:
+            self._raise_writer_error()
+            path = self.save_dir / f"{self.prefix}_epoch{epoch:04d}.pth"
+            # Cópia em CPU para a thread: o slot pode ser reutilizado antes da gravação
+            state_dict = self._unflatten(self._slots[slot_idx], device=torch.device('cpu'))
+            payload = self._checkpoint_payload(state_dict, val_loss, epoch)
+            self._queue.put(('save', path, payload))
+        
+        self.entries.append((val_loss, epoch, slot_idx, path))
+        self.entries.sort(key=lambda entry: (entry[0], entry[1]))
+        is_best = self.entries[0][2] == slot_idx
+        if is_best and self.save_dir is not None:
+            self._queue.put(('save', self.save_dir / f"{self.prefix}_best.pth", payload))
+        return is_best
+    
+    def state_dict(self, rank: int = 0) -> Dict[str, torch.Tensor]:
+        """Cópia do state_dict do snapshot de posição rank (0 = melhor)"""
+        if not self.entries:
+            raise RuntimeError("Nenhum snapshot registrado")
+        return self._unflatten(self._slots[self.entries[rank][2]])
+    
+    def restore_best(self, model: Optional[nn.Module] = None) -> nn.Module:
+        """Carrega o melhor snapshot no modelo (padrão: o modelo monitorado)"""
+        model = model if model is not None else self.model
+        model.load_state_dict(self.state_dict(0))
+        return model
+    
+    def export_state(self) -> Dict:
+        """
+        Entradas do top-k com os pesos (em CPU), para retomar o treino
+        
+        Returns:
+            Dict com 'entries' [(val_loss, epoch, caminho)] e 'state_dicts'
+            (mesma ordem, do melhor para o pior)
+        """
+        return {
+            'entries': [(loss, epoch, str(path) if path is not None else None)
+                        for loss, epoch, _, path in self.entries],
+            'state_dicts': [self._unflatten(self._slots[slot], device=torch.device('cpu'))
+                            for _, _, slot, _ in self.entries]
+        }
+    
+    def load_exported_state(self, state: Dict) -> None:
+        """Restaura as entradas de export_state() (os .pth já gravados são mantidos)"""
+        if len(state['entries']) > self.top_k:
+            raise ValueError(f"Estado com {len(state['entries'])} snapshots para top_k={self.top_k}")
+        self.entries = []
+        for slot_idx, ((loss, epoch, path), state_dict) in enumerate(zip(state['entries'], state['state_dicts'])):
+            with torch.no_grad():
+                for dtype, entries in self._layout.items():
+                    torch.cat([state_dict[name].reshape(-1) for name, _, _, _ in entries],
+                              out=self._slots[slot_idx][dtype])
+            self.entries.append((loss, epoch, slot_idx, Path(path) if path is not None else None))
+    
+    def _write_loop(self) -> None:
+        """Thread de gravação: processa a fila na ordem de chegada"""
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                action, path, payload = item
+                if action == 'save':
+                    tmp = path.with_suffix(f'.{os.getpid()}.tmp')
+                    torch.save(payload, tmp)
+                    os.replace(tmp, path)
+                elif path.exists():
+                    path.unlink()
+            except BaseException as e:
+                self._error = e
+            finally:
+                self._queue.task_done()
+    
+    def _raise_writer_error(self) -> None:
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise RuntimeError(f"Falha ao gravar checkpoint: {error}") from error
+    
+    def flush(self) -> None:
+        """Aguarda todas as gravações pendentes"""
+        if self._queue is not None:
+            self._queue.join()
+            self._raise_writer_error()
+    
+    def close(self) -> None:
+        """Conclui as gravações pendentes e encerra a thread"""
+        if self._writer is not None and self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+        self._raise_writer_error()
+    
+    def __enter__(self) -> 'CheckpointManager':
+        return self
+    
+    def __exit__(self, *exc) -> None:
+        self.close()
 
 
 def get_predictions(
     model: nn.Module,
     dataloader: DataLoader,
-    device: torch.device
+    device: torch.device,
+    autocast_dtype: Optional[Union[str, torch.dtype]] = None
 ) -> Tuple[np.ndarray, np.ndarray]:
     """
     Obtém predições do modelo
@@ -141,7 +542,8 @@ def get_predictions(
         model: Modelo neural
         dataloader: DataLoader
         device: Device (CPU/GPU)
-        
+        autocast_dtype: Precisão mista no forward (predições voltam em float32)
+    
     Returns:
         Tupla (y_true, y_pred)
     """
@@ -152,13 +554,475 @@ def get_predictions(
     with torch.no_grad():
         for X_batch, y_batch in dataloader:
             X_batch = X_batch.to(device)
-            predictions = model(X_batch)
+            with autocast_context(device, autocast_dtype):
+                predictions = model(X_batch)
             
-            y_true_list.append(y_batch.numpy())
-            y_pred_list.append(predictions.cpu().numpy())
+            y_true_list.append(y_batch)
+            y_pred_list.append(predictions.float())
     
-    y_true = np.concatenate(y_true_list)
-    y_pred = np.concatenate(y_pred_list).flatten()
+    # Uma única transferência para o host ao final
+    y_true = torch.cat(y_true_list).cpu().numpy().flatten()
+    y_pred = torch.cat(y_pred_list).cpu().numpy().flatten()
     
     return y_true, y_pred
 
+
+def build_optimizer(
+    name: str,
+    params: Iterable[nn.Parameter],
+    learning_rate: float,
+    weight_decay: float = 0.0
+) -> torch.optim.Optimizer:
+    """
+    Cria o otimizador pelo nome (mesmas opções da busca do Optuna)
+    
+    'LBFGS' seleciona o modo full-batch de segunda ordem (ver
+    train_epoch_lbfgs): busca em linha strong Wolfe, com o weight decay
+    guardado no param_group e aplicado como penalidade L2 no closure. Com
+    busca em linha, learning_rate=1.0 é o valor usual.
+    
+    Args:
+        name: 'Adam', 'RMSprop', 'SGD' ou 'LBFGS'
+        params: Parâmetros do modelo
+        learning_rate: Learning rate
+        weight_decay: Regularização L2
+    
+    Returns:
+        Otimizador configurado
+    """
+    if name == 'Adam':
+        return torch.optim.Adam(params, lr=learning_rate, weight_decay=weight_decay)
+    if name == 'RMSprop':
+        return torch.optim.RMSprop(params, lr=learning_rate, weight_decay=weight_decay)
+    if name == 'SGD':
+        return torch.optim.SGD(params, lr=learning_rate, weight_decay=weight_decay)
+    if name == 'LBFGS':
+        return torch.optim.LBFGS(
+            [{'params': list(params), 'weight_decay': weight_decay}],
+            lr=learning_rate, max_iter=20, history_size=10, line_search_fn='strong_wolfe'
+        )
+    raise ValueError(f"Otimizador não suportado: {name}")
+
+
+def _rng_state(train_loader: Iterable) -> Dict:
+    """Estados dos geradores aleatórios (torch, CUDA, numpy, random e do loader)"""
+    kind, keys, pos, has_gauss, cached = np.random.get_state()
+    generator = getattr(train_loader, 'generator', None)
+    return {
+        'torch': torch.get_rng_state(),
+        'cuda': torch.cuda.get_rng_state_all() if torch.cuda.is_available() else [],
+        'numpy': (kind, torch.from_numpy(keys.astype(np.int64)), pos, has_gauss, cached),
+        'random': random.getstate(),
+        'loader': generator.get_state() if generator is not None else None
+    }
+
+
+def _set_rng_state(state: Dict, train_loader: Iterable) -> None:
+    torch.set_rng_state(state['torch'])
+    if state['cuda'] and torch.cuda.is_available():
+        torch.cuda.set_rng_state_all(state['cuda'])
+    kind, keys, pos, has_gauss, cached = state['numpy']
+    np.random.set_state((kind, keys.numpy().astype(np.uint32), pos, has_gauss, cached))
+    random.setstate(state['random'])
+    generator = getattr(train_loader, 'generator', None)
+    if generator is not None and state['loader'] is not None:
+        generator.set_state(state['loader'])
+
+
+def _save_snapshot(path: Path, snapshot: Dict) -> None:
+    """Gravação atômica: uma interrupção no meio nunca corrompe o snapshot anterior"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f'.{os.getpid()}.tmp')
+    torch.save(snapshot, tmp)
+    os.replace(tmp, path)
+
+
+def snapshot_dir_for(root: Union[str, Path], config: Dict, data_key: str) -> Path:
+    """
+    Diretório de snapshots de um treino: root/<hash do config e dos dados>
+    
+    Um config diferente (ou outro dataset) nunca retoma o snapshot de outro treino.
+    
+    Args:
+        root: Diretório base (ex.: config['snapshot_dir'])
+        config: Hiperparâmetros do treino
+        data_key: Identificação dos dados (ex.: data_fingerprint(X, y))
+    
+    Returns:
+        Path do diretório (não é criado aqui)
+    """
+    relevant = {k: v for k, v in config.items() if k not in _SNAPSHOT_IGNORED_KEYS}
+    payload = json.dumps({'config': relevant, 'data': data_key}, sort_keys=True, default=str)
+    return Path(root) / hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def fit(
+    model: nn.Module,
+    train_loader: DataLoader,
+    val_loader: DataLoader,
+    optimizer: torch.optim.Optimizer,
+    device: torch.device,
+    max_epochs: int = 500,
+    patience: int = 20,
+    criterion: Optional[nn.Module] = None,
+    epoch_callback: Optional[Callable[[int, Dict], None]] = None,
+    accumulate_on_device: bool = False,
+    autocast_dtype: Optional[Union[str, torch.dtype]] = None,
+    checkpoint_manager: Optional[CheckpointManager] = None,
+    snapshot_path: Optional[Union[str, Path]] = None,
+    snapshot_every: int = 10,
+    tune_threads: bool = False
+) -> Dict:
+    """
+    Loop completo de treino com Early Stopping e Model Checkpointing
+    
+    Ao final, os pesos da melhor época (menor loss de validação) são
+    carregados no modelo. Os snapshots ficam a cargo de um
+    CheckpointManager (em memória, top-1, quando nenhum é passado).
+    
+    Com um otimizador L-BFGS, o treino é full-batch: o train_loader é
+    concatenado uma vez e cada época é um passo do L-BFGS (mesmo Early
+    Stopping e checkpointing).
+    
+    Com snapshot_path, o estado completo do treino (modelo, otimizador,
+    Early Stopping, checkpoints, histórico, época e geradores aleatórios,
+    inclusive o do embaralhamento do loader) é gravado a cada snapshot_every
+    épocas e ao final. Se o arquivo já existir, o treino continua da época
+    salva, com o mesmo resultado de uma execução sem interrupção; um treino
+    já concluído retorna direto o histórico salvo.
+    
+    Args:
+        model: Modelo neural (já no device)
+        train_loader: DataLoader de treino
+        val_loader: DataLoader de validação
+        optimizer: Otimizador
+        device: Device (CPU/GPU)
+        max_epochs: Máximo de épocas
+        patience: Paciência do Early Stopping
+        criterion: Função de perda (padrão: MSELoss)
+        epoch_callback: Chamada a cada época com (epoch, history), após o
+            checkpointing (ex.: trial.report do Optuna); exceções propagam
+        accumulate_on_device: Perdas acumuladas no device (ver train_epoch)
+        autocast_dtype: Precisão mista (ex.: 'bfloat16'); não se aplica ao L-BFGS,
+            cuja busca em linha depende de perdas em float32
+        checkpoint_manager: CheckpointManager do modelo (ex.: top-k com gravação
+            em disco); quem o criou é responsável por close()
+        snapshot_path: Arquivo do snapshot para retomar o treino (opcional)
+        snapshot_every: Intervalo em épocas entre snapshots
+        tune_threads: Se True, ajusta as threads do PyTorch ao MLP e ao batch
+            deste treino e as aplica no processo (src/runtime.py, em cache).
+            run_kfold e run_parallel_search já ajustam cada worker; use em
+            chamadas diretas de fit
+    
+    Returns:
+        Dict com 'train_losses', 'val_losses', 'best_val_loss', 'best_epoch'
+        e 'state_dict' (cópia dos pesos da melhor época)
+    """
+    criterion = criterion if criterion is not None else nn.MSELoss()
+    early_stopping = EarlyStopping(patience=patience)
+    checkpoint = checkpoint_manager if checkpoint_manager is not None else CheckpointManager(model)
+    history = {
+        'train_losses': [],
+        'val_losses': [],
+        'best_val_loss': float('inf'),
+        'best_epoch': 0,
+        'state_dict': None
+    }
+    
+    full_batch = isinstance(optimizer, torch.optim.LBFGS)
+    if full_batch:
+        # Antes de restaurar um snapshot: percorrer o loader consome o gerador
+        batches = list(train_loader)
+        X_full = torch.cat([b[0] for b in batches]).to(device)
+        y_full = torch.cat([b[1] for b in batches]).to(device)
+    
+    if tune_threads and device.type == 'cpu':
+        from .runtime import tune_threads_for_model
+        
+        batch_size = len(X_full) if full_batch else train_loader.batch_size
+        tune_threads_for_model(model, batch_size=batch_size, mode='train', probe_interop=True)
+    
+    start_epoch = 1
+    completed = False
+    snapshot_path = Path(snapshot_path) if snapshot_path is not None else None
+    if snapshot_path is not None and snapshot_path.exists():
+        snapshot = torch.load(snapshot_path, map_location='cpu')
+        model.load_state_dict(snapshot['model_state_dict'])
+        optimizer.load_state_dict(snapshot['optimizer_state_dict'])
+        early_stopping.load_state_dict(snapshot['early_stopping'])
+        checkpoint.load_exported_state(snapshot['checkpoint'])
+        history.update(snapshot['history'])
+        _set_rng_state(snapshot['rng'], train_loader)
+        start_epoch = snapshot['epoch'] + 1
+        completed = snapshot['completed']
+        print(f"♻️ Retomando de {snapshot_path} (época {snapshot['epoch']}"
+              + (", treino concluído)" if completed else ")"))
+    
+    def save_snapshot(epoch: int, done: bool) -> None:
+        _save_snapshot(snapshot_path, {
+            'epoch': epoch,
+            'completed': done,
+            'model_state_dict': model.state_dict(),
+            'optimizer_state_dict': optimizer.state_dict(),
+            'early_stopping': early_stopping.state_dict(),
+            'checkpoint': checkpoint.export_state(),
+            'history': {k: v for k, v in history.items() if k != 'state_dict'},
+            'rng': _rng_state(train_loader)
+        })
+    
+    epoch = start_epoch - 1
+    last_epoch = start_epoch - 1 if completed else max_epochs
+    for epoch in range(start_epoch, last_epoch + 1):
+        if full_batch:
+            dropout_seed = int(torch.randint(0, 2 ** 31 - 1, (1,)).item())
+            train_loss = train_epoch_lbfgs(model, X_full, y_full, criterion, optimizer, dropout_seed)
+        else:
+            train_loss = train_epoch(
+                model, train_loader, criterion, optimizer, device, accumulate_on_device, autocast_dtype
+            )
+        val_loss = validate_epoch(model, val_loader, criterion, device, accumulate_on_device, autocast_dtype)
+        
+        history['train_losses'].append(train_loss)
+        history['val_losses'].append(val_loss)
+        
+        # Model Checkpointing (cópia real dos tensores, não só do dict)
+        if checkpoint.update(val_loss, epoch):
+            history['best_val_loss'] = val_loss
+            history['best_epoch'] = epoch
+        
+        if epoch_callback is not None:
+            epoch_callback(epoch, history)
+        
+        if early_stopping(val_loss):
+            break
+        
+        if snapshot_path is not None and epoch % snapshot_every == 0 and epoch < max_epochs:
+            save_snapshot(epoch, done=False)
+    
+    if snapshot_path is not None and not completed:
+        save_snapshot(epoch, done=True)
+    
+    if checkpoint.entries:
+        history['state_dict'] = checkpoint.state_dict()
+        model.load_state_dict(history['state_dict'])
+    else:
+        # Todas as épocas divergiram (loss NaN/infinita): mantém os pesos finais
+        history['state_dict'] = {name: value.detach().clone() for name, value in model.state_dict().items()}
+    return history
+
+
+def _init_worker(thread_settings: Dict) -> None:
+    """
+    Inicializador dos processos: aplica as threads intra-op e inter-op do
+    PyTorch antes de qualquer trabalho paralelo (inter-op só pode ser
+    definido nesse momento)
+    """
+    from .runtime import apply_thread_settings
+    
+    apply_thread_settings(thread_settings)
+
+
+def prepare_fold(
+    fold: Dict,
+    config: Dict,
+    device: torch.device
+) -> Tuple[nn.Module, DataLoader, DataLoader, torch.optim.Optimizer]:
+    """
+    Monta modelo, loaders e otimizador de um fold a partir do config
+    
+    O fold k usa seed config['seed'] + k para inicialização e embaralhamento,
+    de modo que o resultado não depende de qual processo o executa.
+    
+    Args:
+        fold: Fold de get_kfold_splits
+        config: Hiperparâmetros (chaves de DEFAULT_CONFIG)
+        device: Device (CPU/GPU)
+    
+    Returns:
+        Tupla (model, train_loader, val_loader, optimizer)
+    """
+    from .dataset import make_fold_loaders
+    from .model import MLP, compile_model
+    
+    seed = config['seed'] + fold['fold']
+    torch.manual_seed(seed)
+    np.random.seed(seed)
+    
+    model = MLP(
+        input_dim=fold['X_train'].shape[1],
+        hidden_dims=config['hidden_dims'],
+        output_dim=1,
+        dropout_rate=config['dropout_rate'],
+        use_batch_norm=config['use_batch_norm']
+    ).to(device)
+    if config.get('compile_backend'):
+        compile_model(model, config['compile_backend'])
+    train_loader, val_loader = make_fold_loaders(
+        fold,
+        batch_size=config['batch_size'],
+        drop_last=config['use_batch_norm'] and config['optimizer'] != 'LBFGS',
+        generator=torch.Generator().manual_seed(seed)
+    )
+    optimizer = build_optimizer(
+        config['optimizer'], model.parameters(), config['learning_rate'], config['weight_decay']
+    )
+    return model, train_loader, val_loader, optimizer
+
+
+def _run_fold(
+    fold: Dict,
+    config: Dict,
+    device: torch.device,
+    warm_start=None,
+    snapshot_dir: Optional[Path] = None
+) -> Dict:
+    """Treina e avalia um fold (executado no processo principal ou em um worker)"""
+    from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
+    from .model import load_compatible_state
+    
+    model, train_loader, val_loader, optimizer = prepare_fold(fold, config, device)
+    if warm_start is not None:
+        initial_state = warm_start.lookup(fold['fold'], config)
+        if initial_state is not None:
+            load_compatible_state(model, initial_state)
+    
+    # Checkpoints em disco por fold (opcional), gravados em segundo plano
+    checkpoint = None
+    if config['checkpoint_dir'] is not None:
+        checkpoint = CheckpointManager(
+            model,
+            top_k=config['checkpoint_top_k'],
+            save_dir=os.path.join(config['checkpoint_dir'], f"fold_{fold['fold']}"),
+            prefix='model',
+            metadata={'fold': fold['fold'], 'config': config}
+        )
+    
+    snapshot_path = None
+    if snapshot_dir is not None:
+        snapshot_path = Path(snapshot_dir) / f"fold_{fold['fold']}.pt"
+    
+    try:
+        history = fit(
+            model, train_loader, val_loader, optimizer, device,
+            max_epochs=config['max_epochs'], patience=config['patience'],
+            accumulate_on_device=config['accumulate_on_device'],
+            autocast_dtype=config['autocast_dtype'],
+            checkpoint_manager=checkpoint,
+            snapshot_path=snapshot_path,
+            snapshot_every=config['snapshot_every']
+        )
+    finally:
+        if checkpoint is not None:
+            checkpoint.close()
+    
+    # Avaliação final com os pesos da melhor época
+    y_true, y_pred = get_predictions(model, val_loader, device, config['autocast_dtype'])
+    history.update({
+        'fold': fold['fold'],
+        'y_true': y_true,
+        'y_pred': y_pred,
+        'mse': float(mean_squared_error(y_true, y_pred)),
+        'mae': float(mean_absolute_error(y_true, y_pred)),
+        'r2': float(r2_score(y_true, y_pred)),
+        'state_dict': {k: v.cpu() for k, v in history['state_dict'].items()}
+    })
+    return history
+
+
+def run_kfold(
+    X: np.ndarray,
+    y: np.ndarray,
+    config: Optional[Dict] = None,
+    n_workers: int = 1,
+    threads_per_worker: Optional[int] = None,
+    device: Optional[torch.device] = None,
+    cache_dir: Optional[str] = None,
+    warm_start=None
+) -> List[Dict]:
+    """
+    Validação cruzada K-Fold com os folds distribuídos em um pool de processos
+    
+    Cada worker fixa as threads do PyTorch ao iniciar, para que os processos
+    não disputem os mesmos núcleos. Por padrão, com config['tune_threads'],
+    as threads intra-op e inter-op vêm de um micro-benchmark do MLP e do
+    batch do config rodando em n_workers processos simultâneos
+    (src/runtime.py, em cache por máquina), limitado aos núcleos divididos
+    igualmente entre os workers; sem ele, usa a divisão direta. Com
+    n_workers=1 os folds rodam em sequência no próprio processo.
+    
+    Com config['snapshot_dir'], cada fold grava snapshots do treino em
+    snapshot_dir/<hash do config e dos dados>/fold_k.pt: chamar run_kfold
+    de novo com os mesmos argumentos após uma interrupção retoma cada fold
+    de onde parou (folds concluídos não são retreinados).
+    
+    Exemplo:
+        >>> results = run_kfold(X, y, {'max_epochs': 200}, n_workers=5)
+        >>> np.mean([r['mse'] for r in results])
+    
+    Args:
+        X: Features (n_samples, n_features), sem normalização
+        y: Targets (n_samples,)
+        config: Hiperparâmetros (chaves ausentes vêm de DEFAULT_CONFIG)
+        n_workers: Número de processos
+        threads_per_worker: Threads intra-op por worker (padrão: ajuste
+            automático até núcleos / n_workers)
+        device: Device (padrão: CPU)
+        cache_dir: Diretório do cache de folds em disco (opcional)
+        warm_start: WarmStartRegistry para inicializar cada fold a partir de
+            modelos anteriores; os folds treinados são registrados nele ao
+            final (com n_workers > 1, cada worker recebe uma cópia do registro)
+    
+    Returns:
+        Lista ordenada por fold de dicts com 'fold', 'train_losses',
+        'val_losses', 'best_val_loss', 'best_epoch', 'y_true', 'y_pred',
+        'mse', 'mae', 'r2' e 'state_dict' (melhor checkpoint, em CPU)
+    """
+    from .dataset import get_kfold_splits, data_fingerprint
+    from .runtime import apply_thread_settings, available_cores, tune_threads_for_config
+    
+    config = {**DEFAULT_CONFIG, **(config or {})}
+    device = device if device is not None else torch.device('cpu')
+    folds = get_kfold_splits(X, y, n_splits=config['k_folds'], seed=config['seed'], cache_dir=cache_dir)
+    snapshot_dir = None
+    if config['snapshot_dir'] is not None:
+        snapshot_dir = snapshot_dir_for(config['snapshot_dir'], config, data_fingerprint(X, y))
+    
+    n_workers = max(1, min(n_workers, len(folds)))
+    if threads_per_worker is not None:
+        thread_settings = {'intra_op': threads_per_worker, 'inter_op': None}
+    elif config['tune_threads']:
+        thread_settings = tune_threads_for_config(
+            X.shape[1], config, n_workers=n_workers, probe_interop=True, apply=False
+        )
+    else:
+        thread_settings = {'intra_op': max(1, available_cores() // n_workers), 'inter_op': None}
+    
+    if n_workers == 1:
+        previous_threads = torch.get_num_threads()
+        apply_thread_settings(thread_settings)
+        results = []
+        try:
+            for fold in folds:
+                result = _run_fold(fold, config, device, warm_start, snapshot_dir)
+                if warm_start is not None:
+                    warm_start.register(fold['fold'], config, result['state_dict'], result['best_val_loss'])
+                results.append(result)
+        finally:
+            torch.set_num_threads(previous_threads)
+        return results
+    
+    # 'spawn' evita herdar o estado de threads do OpenMP do processo pai
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(
+        max_workers=n_workers,
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=(thread_settings,)
+    ) as executor:
+        futures = [executor.submit(_run_fold, fold, config, device, warm_start, snapshot_dir) for fold in folds]
+        results = [future.result() for future in futures]
+    
+    if warm_start is not None:
+        for result in results:
+            warm_start.register(result['fold'], config, result['state_dict'], result['best_val_loss'])
+    return results
@@ -0,0 +1,1038 @@
+"""
+Módulo de Otimização de Hiperparâmetros
+Busca com Optuna em vários processos locais sobre storage em arquivo
+"""
+
+import os
+import json
+import math
+import time
+import sqlite3
+import hashlib
+import sys
+import shutil
+import threading
+import multiprocessing
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+import optuna
+import torch
+
+from .dataset import get_kfold_splits, data_fingerprint
+from .model import WarmStartRegistry, load_compatible_state
+from .runtime import apply_thread_settings, tune_threads_for_config
+from .train import (
+    DEFAULT_CONFIG, CheckpointManager, EarlyStopping, fit, prepare_fold,
+    snapshot_dir_for, train_epoch, train_epoch_lbfgs, validate_epoch
+)
+
+
+# Mesmas configurações do estudo do notebook
+DEFAULT_PRUNER_KWARGS = {'min_resource': 10, 'max_resource': 100, 'reduction_factor': 3}
+FINISHED_STATES = (optuna.trial.TrialState.COMPLETE, optuna.trial.TrialState.PRUNED)
+
+
+def make_storage(path: Union[str, Path]) -> Union[str, optuna.storages.BaseStorage]:
+    """
+    Cria o storage compartilhado do estudo a partir do caminho do arquivo
+    
+    Arquivos '.db'/'.sqlite' usam SQLite (RDBStorage); qualquer outra
+    extensão (ex.: '.log') usa o journal em arquivo do Optuna, que dispensa
+    um banco e tolera bem vários processos escrevendo ao mesmo tempo.
+    
+    Args:
+        path: Caminho do arquivo de storage
+    
+    Returns:
+        URL do SQLite ou JournalStorage
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix in ('.db', '.sqlite', '.sqlite3'):
+        return f"sqlite:///{path.resolve()}"
+    
+    try:
+        from optuna.storages.journal import JournalFileBackend
+        backend = JournalFileBackend(str(path))
+    except ImportError:
+        # Optuna 3.x
+        backend = optuna.storages.JournalFileStorage(str(path))
+    return optuna.storages.JournalStorage(backend)
+
+
+def make_pruner(**kwargs) -> optuna.pruners.BasePruner:
+    """HyperbandPruner com os parâmetros do notebook (sobrescrevíveis)"""
+    return optuna.pruners.HyperbandPruner(**{**DEFAULT_PRUNER_KWARGS, **kwargs})
+
+
+def load_or_create_study(
+    study_name: str,
+    storage_path: Union[str, Path],
+    seed: int = 42,
+    direction: str = 'minimize',
+    pruner_kwargs: Optional[Dict] = None
+) -> optuna.Study:
+    """
+    Cria o estudo no storage em arquivo, ou carrega o existente (retomada)
+    
+    Args:
+        study_name: Nome do estudo
+        storage_path: Arquivo de storage (ver make_storage)
+        seed: Seed do TPESampler
+        direction: 'minimize' ou 'maximize'
+        pruner_kwargs: Parâmetros do HyperbandPruner (opcional)
+    
+    Returns:
+        optuna.Study
+    """
+    return optuna.create_study(
+        study_name=study_name,
+        storage=make_storage(storage_path),
+        sampler=optuna.samplers.TPESampler(seed=seed),
+        pruner=make_pruner(**(pruner_kwargs or {})),
+        direction=direction,
+        load_if_exists=True
+    )
+
+
+def hidden_dims_from_params(n_layers: int, hidden_units: int) -> List[int]:
+    """Arquitetura decrescente da busca (ex.: 128 -> [128, 64, 32]), mínimo 16"""
+    hidden_dims = []
+    current_units = hidden_units
+    for _ in range(n_layers):
+        hidden_dims.append(current_units)
+        current_units = max(16, current_units // 2)
+    return hidden_dims
+
+
+class TrialCache:
+    """
+    Cache persistente (SQLite) de resultados de trials.
+    
+    A chave é o hash dos hiperparâmetros canonizados (config efetivo de
+    treino, ex.: hidden_dims em vez de n_layers/hidden_units) mais o
+    contexto do experimento (hash dos dados, folds, seed, épocas). Floats
+    são agrupados em faixas de tolerância relativa, de modo que propostas do
+    TPE praticamente idênticas a uma já avaliada reutilizam o resultado.
+    
+    Cada processo abre uma única conexão, na primeira operação; ela não é
+    serializada (um worker 'spawn' abre a sua), o que permite vários
+    processos compartilharem o mesmo cache. close() fecha a conexão do
+    processo atual, e o objeto também pode ser usado como context manager.
+    
+    Exemplo:
+        >>> with TrialCache('optuna/trial_cache.db', float_tolerance=0.01) as cache:
+        ...     objective = KFoldObjective(X, y, cache=cache)
+        ...     study.optimize(objective, n_trials=100)
+    """
+    
+    def __init__(self, path: Union[str, Path] = 'optuna/trial_cache.db', float_tolerance: float = 0.01):
+        """
+        Args:
+            path: Arquivo SQLite do cache (criado se não existir)
+            float_tolerance: Tolerância relativa dos floats (0 = comparação exata)
+        """
+        self.path = Path(path)
+        self.float_tolerance = float_tolerance
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = None
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS trial_results ("
+                "key TEXT PRIMARY KEY, params TEXT, value REAL, user_attrs TEXT, created REAL)"
+            )
+    
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Conexão do processo (aberta na primeira vez), em transação e com lock entre threads"""
+        with self._lock:
+            if self._conn is None:
+                self._conn = sqlite3.connect(str(self.path), timeout=30.0, check_same_thread=False)
+            with self._conn:
+                yield self._conn
+    
+    def close(self) -> None:
+        """Fecha a conexão deste processo (reaberta se o cache for usado de novo)"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+    
+    def __enter__(self) -> 'TrialCache':
+        return self
+    
+    def __exit__(self, *exc) -> None:
+        self.close()
+    
+    def __getstate__(self) -> Dict:
+        # Conexão e lock são do processo; o worker abre os seus
+        state = self.__dict__.copy()
+        state['_conn'] = None
+        del state['_lock']
+        return state
+    
+    def __setstate__(self, state: Dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+    
+    def _canonical(self, value):
+        """Normaliza um valor para a chave (floats em faixas de tolerância)"""
+        if isinstance(value, bool) or value is None or isinstance(value, (int, str)):
+            return value
+        if isinstance(value, float):
+            if value == 0.0 or self.float_tolerance <= 0:
+                return value
+            bucket = round(math.log(abs(value)) / math.log1p(self.float_tolerance))
+            return ['f', math.copysign(1, value), bucket]
+        if isinstance(value, (list, tuple)):
+            return [self._canonical(v) for v in value]
+        if isinstance(value, dict):
+            return {k: self._canonical(v) for k, v in sorted(value.items())}
+        return str(value)
+    
+    def key(self, params: Dict, context: Dict) -> str:
+        """
+        Chave do cache
+        
+        Args:
+            params: Hiperparâmetros do trial
+            context: Identificação dos dados/folds (comparada exatamente)
+        
+        Returns:
+            Hash SHA-256 hexadecimal
+        """
+        payload = json.dumps(
+            {'params': self._canonical(params), 'context': context, 'tol': self.float_tolerance},
+            sort_keys=True
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    def get(self, key: str) -> Optional[Dict]:
+        """Resultado armazenado ({'value', 'user_attrs'}) ou None"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT value, user_attrs FROM trial_results WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {'value': row[0], 'user_attrs': json.loads(row[1])}
+    
+    def put(self, key: str, params: Dict, value: float, user_attrs: Optional[Dict] = None) -> None:
+        """Armazena (ou substitui) o resultado de uma configuração"""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO trial_results VALUES (?, ?, ?, ?, ?)",
+                (key, json.dumps(params, sort_keys=True), float(value),
+                 json.dumps(user_attrs or {}), time.time())
+            )
+    
+    def __len__(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM trial_results").fetchone()[0]
+
+
+class KFoldObjective:
+    """
+    Função objetivo do Optuna: MSE médio do K-Fold para um conjunto de
+    hiperparâmetros (mesmo espaço de busca do notebook).
+    
+    Pruning com passo global monotônico: a época e do fold i (0-based) é
+    reportada no passo i * max_epochs + e, com o valor da média corrente do
+    MSE por fold (folds concluídos + melhor loss do fold atual). Assim o
+    HyperbandPruner compara trials na mesma escala e pode podar uma
+    configuração ruim ainda no primeiro fold. Os recursos do pruner ficam
+    em unidades de passo global (ver pruner_kwargs()).
+    
+    O objeto é serializável e pode ser usado direto em run_parallel_search,
+    que chama close() ao fim de cada worker (fecha a conexão do cache).
+    
+    Exemplo:
+        >>> objective = KFoldObjective(X, y, n_splits=3)
+        >>> study = run_parallel_search(objective, n_trials=200, n_workers=8)
+    """
+    
+    def __init__(
+        self,
+        X: np.ndarray,
+        y: np.ndarray,
+        n_splits: int = 3,
+        seed: int = 42,
+        max_epochs: int = 100,
+        patience: int = 15,
+        device: Optional[torch.device] = None,
+        cache_dir: Optional[str] = None,
+        cache: Optional[TrialCache] = None,
+        optimizers: Sequence[str] = ('Adam', 'RMSprop'),
+        compile_backend: Optional[str] = None,
+        warm_start: Optional[WarmStartRegistry] = None,
+        snapshot_dir: Optional[str] = None,
+        snapshot_every: int = 10
+    ):
+        """
+        Args:
+            X: Features (n_samples, n_features), sem normalização
+            y: Targets (n_samples,)
+            n_splits: Número de folds (K=3 no notebook, para acelerar)
+            seed: Seed do K-Fold e dos modelos
+            max_epochs: Máximo de épocas por fold
+            patience: Paciência do Early Stopping
+            device: Device (padrão: CPU)
+            cache_dir: Diretório do cache de folds em disco (opcional)
+            cache: Cache de resultados para configurações repetidas (opcional)
+            optimizers: Otimizadores da busca; incluir 'LBFGS' adiciona o modo
+                full-batch, com learning rate próprio ('lbfgs_learning_rate')
+            compile_backend: Modo compilado do MLP ('auto', 'compile', 'script';
+                None = eager), com cache por arquitetura entre trials
+            warm_start: Registro de modelos para inicializar cada fold a partir
+                do trial concluído mais próximo (opcional)
+            snapshot_dir: Diretório de snapshots do treino (opcional), com um
+                subdiretório por trial. Um trial interrompido (processo morto
+                ou KeyboardInterrupt) é re-enfileirado por run_parallel_search
+                com os mesmos parâmetros e retoma cada fold de onde parou; os
+                snapshots são apagados quando o trial termina, falha ou é podado
+            snapshot_every: Intervalo em épocas entre snapshots
+        """
+        self.X = X
+        self.y = y
+        self.n_splits = n_splits
+        self.seed = seed
+        self.max_epochs = max_epochs
+        self.patience = patience
+        self.device = device if device is not None else torch.device('cpu')
+        self.cache_dir = cache_dir
+        self.cache = cache
+        self.optimizers = list(optimizers)
+        self.compile_backend = compile_backend
+        self.warm_start = warm_start
+        self.snapshot_dir = snapshot_dir
+        self.snapshot_every = snapshot_every
+        self._fingerprint = None
+    
+    def cache_context(self) -> Dict:
+        """Identificação dos dados e do protocolo de avaliação (parte da chave do cache)"""
+        if self._fingerprint is None:
+            self._fingerprint = data_fingerprint(self.X, self.y)
+        return {
+            'data': self._fingerprint,
+            'n_splits': self.n_splits,
+            'seed': self.seed,
+            'max_epochs': self.max_epochs,
+            'patience': self.patience,
+            'warm_start': self.warm_start is not None
+        }
+    
+    def close(self) -> None:
+        """Fecha a conexão do cache de resultados neste processo (se houver)"""
+        if self.cache is not None:
+            self.cache.close()
+    
+    def pruner_kwargs(self, min_resource: int = 10, reduction_factor: int = 3) -> Dict:
+        """Parâmetros do HyperbandPruner em unidades de passo global"""
+        return {
+            'min_resource': min_resource,
+            'max_resource': self.n_splits * self.max_epochs,
+            'reduction_factor': reduction_factor
+        }
+    
+    def suggest(self, trial: optuna.Trial) -> Dict:
+        """
+        Espaço de busca do notebook, convertido para o config de treino
+        
+        Returns:
+            Config completo (chaves de DEFAULT_CONFIG)
+        """
+        n_layers = trial.suggest_int('n_layers', 1, 3)
+        hidden_units = trial.suggest_categorical('hidden_units', [16, 32, 64, 128])
+        # Mesma ordem de sugestões do notebook: a sequência amostrada pelo TPE
+        # (para uma seed) não muda com o modo L-BFGS desativado
+        dropout_rate = trial.suggest_float('dropout_rate', 0.1, 0.5)
+        learning_rate = trial.suggest_float('learning_rate', 1e-4, 1e-2, log=True)
+        weight_decay = trial.suggest_float('weight_decay', 1e-6, 1e-3, log=True)
+        optimizer = trial.suggest_categorical('optimizer', self.optimizers)
+        if optimizer == 'LBFGS':
+            # Passo inicial da busca em linha: escala diferente dos métodos de primeira ordem
+            learning_rate = trial.suggest_float('lbfgs_learning_rate', 0.1, 1.0, log=True)
+        config = {
+            **DEFAULT_CONFIG,
+            'seed': self.seed,
+            'k_folds': self.n_splits,
+            'max_epochs': self.max_epochs,
+            'patience': self.patience,
+            'compile_backend': self.compile_backend,
+            'hidden_dims': hidden_dims_from_params(n_layers, hidden_units),
+            'dropout_rate': dropout_rate,
+            'learning_rate': learning_rate,
+            'weight_decay': weight_decay,
+            'optimizer': optimizer,
+            'batch_size': trial.suggest_categorical('batch_size', [8, 16, 32]),
+            'use_batch_norm': trial.suggest_categorical('use_batch_norm', [True, False]),
+        }
+        return config
+    
+    def __call__(self, trial: optuna.Trial) -> float:
+        """
+        Treina os K folds em sequência, reportando ao pruner a cada época
+        
+        Returns:
+            MSE médio dos folds (para minimizar)
+        """
+        config = self.suggest(trial)
+        
+        cache_key = None
+        if self.cache is not None:
+            cache_params = {k: config[k] for k in (
+                'hidden_dims', 'dropout_rate', 'learning_rate', 'weight_decay',
+                'optimizer', 'batch_size', 'use_batch_norm'
+            )}
+            cache_key = self.cache.key(cache_params, self.cache_context())
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                for name, value in cached['user_attrs'].items():
+                    trial.set_user_attr(name, value)
+                trial.set_user_attr('cache_hit', True)
+                return cached['value']
+        
+        folds = get_kfold_splits(
+            self.X, self.y, n_splits=self.n_splits, seed=self.seed, cache_dir=self.cache_dir
+        )
+        trial_root = snapshot_dir = None
+        if self.snapshot_dir is not None:
+            # Diretório próprio do trial (ou do trial original, se re-enfileirado):
+            # trials com os mesmos parâmetros nunca compartilham snapshots
+            trial_root = trial_snapshot_root(self.snapshot_dir, trial.study.study_name, resume_key(trial))
+            snapshot_dir = snapshot_dir_for(trial_root, config, self.cache_context()['data'])
+        try:
+            fold_mse, fold_epochs = self._train_folds(trial, config, folds, snapshot_dir)
+        finally:
+            # Podado, com erro ou concluído: o trial não será retomado. Uma
+            # interrupção do processo (kill, KeyboardInterrupt) mantém os
+            # snapshots, e run_parallel_search re-enfileira o trial
+            if trial_root is not None and not isinstance(sys.exc_info()[1], KeyboardInterrupt):
+                shutil.rmtree(trial_root, ignore_errors=True)
+        
+        mean_mse = float(np.mean(fold_mse))
+        trial.set_user_attr('fold_mse', fold_mse)
+        trial.set_user_attr('fold_epochs', fold_epochs)
+        if cache_key is not None:
+            self.cache.put(cache_key, cache_params, mean_mse, {'fold_mse': fold_mse})
+        return mean_mse
+    
+    def _train_folds(
+        self,
+        trial: optuna.Trial,
+        config: Dict,
+        folds: List[Dict],
+        snapshot_dir: Optional[Path]
+    ) -> tuple:
+        """Treina os folds em sequência; retorna (MSE por fold, épocas por fold)"""
+        fold_mse = []
+        fold_epochs = []
+        
+        for fold_idx, fold in enumerate(folds):
+            model, train_loader, val_loader, optimizer = prepare_fold(fold, config, self.device)
+            if self.warm_start is not None:
+                initial_state = self.warm_start.lookup(fold['fold'], config)
+                if initial_state is not None:
+                    load_compatible_state(model, initial_state)
+            
+            def report(epoch: int, history: Dict) -> None:
+                step = fold_idx * self.max_epochs + epoch
+                running_mse = (sum(fold_mse) + history['best_val_loss']) / (len(fold_mse) + 1)
+                trial.report(running_mse, step)
+                if trial.should_prune():
+                    raise optuna.TrialPruned()
+            
+            snapshot_path = None
+            if snapshot_dir is not None:
+                snapshot_path = snapshot_dir / f"fold_{fold['fold']}.pt"
+            history = fit(
+                model, train_loader, val_loader, optimizer, self.device,
+                max_epochs=self.max_epochs, patience=self.patience, epoch_callback=report,
+                snapshot_path=snapshot_path, snapshot_every=self.snapshot_every
+            )
+            fold_mse.append(history['best_val_loss'])
+            fold_epochs.append(len(history['val_losses']))
+            if self.warm_start is not None:
+                self.warm_start.register(fold['fold'], config, history['state_dict'], history['best_val_loss'])
+        
+        return fold_mse, fold_epochs
+
+
+class _ASHAMember:
+    """Configuração em treino no ASHA: modelo, otimizador e Early Stopping de cada fold"""
+    
+    def __init__(
+        self,
+        trial: optuna.Trial,
+        config: Dict,
+        folds: List[Dict],
+        device: torch.device,
+        patience: int,
+        warm_start: Optional[WarmStartRegistry] = None
+    ):
+        self.trial = trial
+        self.config = config
+        self.device = device
+        self.patience = patience
+        self.rung = -1
+        self.rung_scores = {}
+        self.state_dicts = None
+        self.suspended = False
+        self._folds = {fold['fold']: fold for fold in folds}
+        self.runs = [self._build_run(fold, warm_start) for fold in folds]
+    
+    def _build_run(self, fold: Dict, warm_start: Optional[WarmStartRegistry] = None) -> Dict:
+        """Modelo, loaders, otimizador, Early Stopping e CheckpointManager de um fold"""
+        model, train_loader, val_loader, optimizer = prepare_fold(fold, self.config, self.device)
+        if warm_start is not None:
+            initial_state = warm_start.lookup(fold['fold'], self.config)
+            if initial_state is not None:
+                load_compatible_state(model, initial_state)
+        run = {
+            'fold': fold['fold'],
+            'model': model,
+            'train_loader': train_loader,
+            'val_loader': val_loader,
+            'optimizer': optimizer,
+            'early_stopping': EarlyStopping(patience=self.patience),
+            'checkpoint': CheckpointManager(model),
+            'epoch': 0,
+            'stopped': False
+        }
+        if isinstance(optimizer, torch.optim.LBFGS):
+            batches = list(train_loader)
+            run['full_batch'] = (
+                torch.cat([b[0] for b in batches]).to(self.device),
+                torch.cat([b[1] for b in batches]).to(self.device)
+            )
+        return run
+    
+    @property
+    def finished(self) -> bool:
+        """True se todos os folds pararam (Early Stopping ou pesos liberados)"""
+        return self.state_dicts is not None or all(run['stopped'] for run in self.runs)
+    
+    @property
+    def epochs(self) -> int:
+        """Épocas treinadas, somadas sobre os folds"""
+        return sum(run['epoch'] for run in self.runs)
+    
+    def advance(self, epochs: int, criterion: torch.nn.Module) -> int:
+        """
+        Continua o treino de cada fold até a época epochs (ou até o Early Stopping)
+        
+        Returns:
+            Número de épocas efetivamente treinadas (soma dos folds)
+        """
+        self.resume()
+        trained = 0
+        for run in self.runs:
+            if self.state_dicts is not None:
+                break
+            if run['stopped']:
+                continue
+            model, optimizer = run['model'], run['optimizer']
+            while run['epoch'] < epochs and not run['stopped']:
+                if 'full_batch' in run:
+                    dropout_seed = int(torch.randint(0, 2 ** 31 - 1, (1,)).item())
+                    train_epoch_lbfgs(model, *run['full_batch'], criterion, optimizer, dropout_seed)
+                else:
+                    train_epoch(model, run['train_loader'], criterion, optimizer, self.device)
+                val_loss = validate_epoch(model, run['val_loader'], criterion, self.device)
+                run['epoch'] += 1
+                trained += 1
+                run['checkpoint'].update(val_loss, run['epoch'])
+                run['stopped'] = run['early_stopping'](val_loss)
+        return trained
+    
+    def score(self) -> float:
+        """MSE médio dos folds (melhor loss de validação de cada fold)"""
+        return float(np.mean([run['checkpoint'].best_loss for run in self.runs]))
+    
+    def suspend(self) -> None:
+        """
+        Guarda o estado de treino de cada fold em CPU (pesos, otimizador, Early
+        Stopping, melhor snapshot e gerador do loader) e libera modelos,
+        otimizadores, loaders e CheckpointManagers. Folds já parados guardam só
+        os melhores pesos. resume() reconstrói tudo se o membro for promovido.
+        """
+        if self.suspended or self.state_dicts is not None:
+            return
+        runs = []
+        for run in self.runs:
+            checkpoint = run['checkpoint'].export_state()
+            if checkpoint['state_dicts']:
+                best_state = checkpoint['state_dicts'][0]
+            else:
+                # Nenhuma época com loss finita: os pesos atuais são os únicos disponíveis
+                best_state = _to_cpu(run['model'].state_dict())
+            compact = {
+                'fold': run['fold'],
+                'epoch': run['epoch'],
+                'stopped': run['stopped'],
+                'checkpoint': _ReleasedCheckpoint(run['checkpoint'].best_loss, best_state)
+            }
+            if not run['stopped']:
+                generator = getattr(run['train_loader'], 'generator', None)
+                compact['resume_state'] = {
+                    'model': _to_cpu(run['model'].state_dict()),
+                    'optimizer': _to_cpu(run['optimizer'].state_dict()),
+                    'early_stopping': run['early_stopping'].state_dict(),
+                    'checkpoint': checkpoint,
+                    'loader': generator.get_state() if generator is not None else None
+                }
+            runs.append(compact)
+        self.runs = runs
+        self.suspended = True
+    
+    def resume(self) -> None:
+        """Reconstrói os folds suspensos, continuando exatamente de onde pararam"""
+        if not self.suspended:
+            return
+        # prepare_fold fixa as seeds globais; o treino dos demais membros não pode sentir isso
+        torch_state, numpy_state = torch.get_rng_state(), np.random.get_state()
+        runs = []
+        for run in self.runs:
+            state = run.get('resume_state')
+            if state is None:
+                runs.append(run)
+                continue
+            live = self._build_run(self._folds[run['fold']])
+            torch.set_rng_state(torch_state)
+            np.random.set_state(numpy_state)
+            live['model'].load_state_dict(state['model'])
+            live['optimizer'].load_state_dict(state['optimizer'])
+            live['early_stopping'].load_state_dict(state['early_stopping'])
+            live['checkpoint'].load_exported_state(state['checkpoint'])
+            # Depois do full batch do L-BFGS, que consome o gerador ao montar o batch
+            generator = getattr(live['train_loader'], 'generator', None)
+            if generator is not None and state['loader'] is not None:
+                generator.set_state(state['loader'])
+            live['epoch'] = run['epoch']
+            runs.append(live)
+        self.runs = runs
+        self.suspended = False
+    
+    def release(self) -> None:
+        """Guarda só os melhores pesos (CPU) e libera todo o estado de treino"""
+        if self.state_dicts is not None:
+            return
+        self.suspend()
+        self.state_dicts = [run['checkpoint'].best_state for run in self.runs]
+        self.runs = [
+            {'fold': run['fold'], 'epoch': run['epoch'], 'stopped': True, 'checkpoint': run['checkpoint']}
+            for run in self.runs
+        ]
+        self.suspended = False
+
+
+class _ReleasedCheckpoint:
+    """Resumo do CheckpointManager de um fold fora da memória: melhor loss e pesos (CPU)"""
+    
+    def __init__(self, best_loss: float, best_state: Dict[str, torch.Tensor]):
+        self.best_loss = best_loss
+        self.best_state = best_state
+
+
+def _to_cpu(state):
+    """Cópia em CPU de um state_dict (de modelo ou otimizador), recursivamente"""
+    if isinstance(state, torch.Tensor):
+        return state.detach().to('cpu', copy=True)
+    if isinstance(state, dict):
+        return {key: _to_cpu(value) for key, value in state.items()}
+    if isinstance(state, (list, tuple)):
+        return type(state)(_to_cpu(value) for value in state)
+    return state
+
+
+class ASHAScheduler:
+    """
+    Successive halving assíncrono (ASHA) nativo sobre o loop de treino
+    
+    As configurações são treinadas em degraus (rungs) de épocas:
+    min_epochs, min_epochs * eta, min_epochs * eta², ..., max_epochs do
+    objective. Sempre que há um trabalho livre, o scheduler promove a melhor
+    configuração ainda não promovida que esteja no top 1/eta do seu degrau
+    (regra assíncrona: não espera o degrau lotar); se não houver nenhuma,
+    amostra uma nova configuração. Diferente do HyperbandPruner, uma
+    configuração promovida continua do ponto onde parou (modelo, otimizador,
+    Early Stopping e gerador do loader de cada fold), em vez de o treino
+    recomeçar da época 1.
+    
+    Só as configurações hoje promovíveis (top 1/eta do seu degrau) mantêm
+    modelos, otimizadores, loaders e CheckpointManagers vivos; as demais
+    ficam suspensas, com o estado de treino em CPU (reconstruído se forem
+    promovidas mais tarde), e as que terminaram guardam só os melhores pesos.
+    
+    As configurações são propostas por um estudo do Optuna em memória (ask/tell,
+    com o mesmo espaço de busca de KFoldObjective.suggest); o valor informado
+    ao sampler é o MSE médio no primeiro degrau. O orçamento é medido em épocas
+    treinadas (somadas sobre folds e configurações).
+    
+    Exemplo:
+        >>> scheduler = ASHAScheduler(KFoldObjective(X, y, max_epochs=270), min_epochs=10)
+        >>> results = scheduler.run(budget_epochs=20000)
+        >>> results[0]['config'], results[0]['score']
+    """
+    
+    def __init__(
+        self,
+        objective: KFoldObjective,
+        min_epochs: int = 10,
+        reduction_factor: int = 3,
+        sampler: Optional[optuna.samplers.BaseSampler] = None
+    ):
+        """
+        Args:
+            objective: KFoldObjective com dados, folds, espaço de busca e
+                max_epochs (último degrau)
+            min_epochs: Épocas por fold no primeiro degrau
+            reduction_factor: Fator eta entre degraus (promove o top 1/eta)
+            sampler: Sampler do Optuna (padrão: TPESampler com a seed do objective)
+        """
+        if reduction_factor < 2:
+            raise ValueError("reduction_factor deve ser >= 2")
+        self.objective = objective
+        self.reduction_factor = reduction_factor
+        self.rungs = []
+        epochs = min_epochs
+        while epochs < objective.max_epochs:
+            self.rungs.append(epochs)
+            epochs *= reduction_factor
+        self.rungs.append(objective.max_epochs)
+        if sampler is None:
+            sampler = optuna.samplers.TPESampler(seed=objective.seed)
+        self.study = optuna.create_study(direction='minimize', sampler=sampler)
+        self.members: List[_ASHAMember] = []
+        self.epochs_trained = 0
+        self._criterion = torch.nn.MSELoss()
+        self._folds = None
+    
+    def _top(self, rung: int) -> List[_ASHAMember]:
+        """Top 1/eta dos membros que completaram o degrau, do melhor para o pior"""
+        completed = [m for m in self.members if rung in m.rung_scores]
+        n_promotable = len(completed) // self.reduction_factor
+        return sorted(completed, key=lambda m: m.rung_scores[rung])[:n_promotable]
+    
+    def _next_promotion(self) -> Optional[tuple]:
+        """Melhor promoção disponível, do degrau mais alto para o mais baixo"""
+        for rung in reversed(range(len(self.rungs) - 1)):
+            for member in self._top(rung):
+                if member.rung == rung:
+                    return member, rung + 1
+        return None
+    
+    def _suspend_unpromotable(self) -> None:
+        """
+        Suspende os membros fora do top 1/eta do seu degrau: no ASHA eles ainda
+        podem ser promovidos mais tarde (o top cresce com novos membros), então
+        o estado de treino fica em CPU em vez de ser descartado
+        """
+        promotable = set()
+        for rung in range(len(self.rungs) - 1):
+            promotable.update(id(m) for m in self._top(rung) if m.rung == rung)
+        for member in self.members:
+            if id(member) not in promotable:
+                member.suspend()
+    
+    def _new_member(self) -> _ASHAMember:
+        objective = self.objective
+        if self._folds is None:
+            self._folds = get_kfold_splits(
+                objective.X, objective.y, n_splits=objective.n_splits,
+                seed=objective.seed, cache_dir=objective.cache_dir
+            )
+        trial = self.study.ask()
+        member = _ASHAMember(
+            trial, objective.suggest(trial), self._folds, objective.device,
+            objective.patience, objective.warm_start
+        )
+        self.members.append(member)
+        return member
+    
+    def _run_job(self, member: _ASHAMember, rung: int) -> None:
+        self.epochs_trained += member.advance(self.rungs[rung], self._criterion)
+        score = member.score()
+        member.rung = rung
+        member.rung_scores[rung] = score
+        if rung == 0:
+            self.study.tell(member.trial, score)
+        
+        if rung == len(self.rungs) - 1 or member.finished:
+            # Sem treino futuro: libera o estado de otimização e mantém os melhores pesos
+            member.release()
+            warm_start = self.objective.warm_start
+            if warm_start is not None:
+                for run, state_dict in zip(member.runs, member.state_dicts):
+                    warm_start.register(run['fold'], member.config, state_dict, run['checkpoint'].best_loss)
+        self._suspend_unpromotable()
+    
+    def run(
+        self,
+        n_configs: Optional[int] = None,
+        budget_epochs: Optional[int] = None,
+        timeout: Optional[float] = None
+    ) -> List[Dict]:
+        """
+        Executa o ASHA até esgotar um dos limites
+        
+        Pode ser chamado de novo para continuar a busca (limites contam por chamada).
+        
+        Args:
+            n_configs: Máximo de novas configurações; atingido o limite, só
+                promoções são feitas, até não restar nenhuma
+            budget_epochs: Máximo de épocas treinadas (soma sobre folds)
+            timeout: Tempo máximo em segundos
+        
+        Returns:
+            Resultados ordenados (ver results())
+        """
+        if n_configs is None and budget_epochs is None and timeout is None:
+            raise ValueError("Defina n_configs, budget_epochs ou timeout")
+        start = time.perf_counter()
+        start_epochs = self.epochs_trained
+        n_new = 0
+        
+        while True:
+            if budget_epochs is not None and self.epochs_trained - start_epochs >= budget_epochs:
+                break
+            if timeout is not None and time.perf_counter() - start >= timeout:
+                break
+            job = self._next_promotion()
+            if job is None:
+                if n_configs is not None and n_new >= n_configs:
+                    break
+                job = (self._new_member(), 0)
+                n_new += 1
+            self._run_job(*job)
+        
+        results = self.results()
+        if results:
+            best = results[0]
+            print(f"⚡ ASHA: {len(self.members)} configurações, {self.epochs_trained} épocas, "
+                  f"melhor MSE {best['score']:.4f} no degrau {best['rung']} ({best['epochs']} épocas)")
+        return results
+    
+    def results(self) -> List[Dict]:
+        """
+        Resultados por configuração, do degrau mais alto para o mais baixo e,
+        dentro do degrau, por MSE crescente
+        
+        Returns:
+            Lista de dicts com 'number', 'params', 'config', 'rung', 'epochs',
+            'score', 'rung_scores' e 'state_dicts' (melhores pesos por fold,
+            disponível para configurações que terminaram o treino)
+        """
+        ranked = sorted(
+            (m for m in self.members if m.rung >= 0),
+            key=lambda m: (-m.rung, m.rung_scores[m.rung])
+        )
+        return [
+            {
+                'number': m.trial.number,
+                'params': m.trial.params,
+                'config': m.config,
+                'rung': m.rung,
+                'epochs': m.epochs,
+                'score': m.rung_scores[m.rung],
+                'rung_scores': dict(m.rung_scores),
+                'state_dicts': m.state_dicts
+            }
+            for m in ranked
+        ]
+
+
+def resume_key(trial: Union[optuna.Trial, optuna.trial.FrozenTrial]) -> int:
+    """Número do trial original (o próprio, se o trial não foi re-enfileirado)"""
+    return int(trial.user_attrs.get('resume_from', trial.number))
+
+
+def trial_snapshot_root(root: Union[str, Path], study_name: str, key: int) -> Path:
+    """Diretório dos snapshots de um trial: root/<estudo>-trial<número original>"""
+    return Path(root) / f"{study_name.replace(os.sep, '_')}-trial{key}"
+
+
+def _recover_interrupted_trials(study: optuna.Study, snapshot_dir: Optional[str] = None) -> int:
+    """
+    Re-enfileira, com os mesmos parâmetros, os trials interrompidos na
+    execução anterior.
+    
+    Trials que ficaram RUNNING (processo morto) são marcados como FAIL e
+    re-enfileirados. Um KeyboardInterrupt é registrado pelo Optuna como FAIL;
+    esses trials são re-enfileirados se os snapshots ainda existirem em
+    snapshot_dir (os de trials que falharam por erro já foram apagados). O
+    trial novo herda o número original em user_attrs['resume_from'] e, com
+    ele, o diretório de snapshots.
+    
+    Deve ser chamado antes de iniciar os workers (nenhum trial está de fato
+    em execução nesse momento).
+    """
+    running = optuna.trial.TrialState.RUNNING
+    fail = optuna.trial.TrialState.FAIL
+    latest = {}
+    for trial in study.get_trials(deepcopy=False):
+        key = resume_key(trial)
+        if key not in latest or trial.number > latest[key].number:
+            latest[key] = trial
+    
+    n_recovered = 0
+    for key, trial in sorted(latest.items()):
+        if trial.state == running:
+            study.tell(trial.number, state=fail, skip_if_finished=True)
+        elif not (trial.state == fail and snapshot_dir is not None
+                  and trial_snapshot_root(snapshot_dir, study.study_name, key).exists()):
+            continue
+        # Sem skip_if_exists: ele compara com todos os trials, inclusive o interrompido
+        study.enqueue_trial(trial.params, user_attrs={'resume_from': key})
+        n_recovered += 1
+    return n_recovered
+
+
+def _search_worker(
+    worker_id: int,
+    study_name: str,
+    storage_path: str,
+    objective: Callable[[optuna.Trial], float],
+    n_trials_total: int,
+    n_trials_worker: int,
+    seed: int,
+    direction: str,
+    pruner_kwargs: Optional[Dict],
+    thread_settings: Dict
+) -> None:
+    """Processo worker: executa trials até o estudo atingir n_trials_total"""
+    # Antes de qualquer trabalho paralelo: inter-op só pode ser definido agora
+    apply_thread_settings(thread_settings)
+    
+    # Seed distinta por worker: TPE independente, mas reprodutível
+    study = optuna.load_study(
+        study_name=study_name,
+        storage=make_storage(storage_path),
+        sampler=optuna.samplers.TPESampler(seed=seed + worker_id),
+        pruner=make_pruner(**(pruner_kwargs or {}))
+    )
+    try:
+        study.optimize(
+            objective,
+            n_trials=n_trials_worker,
+            callbacks=[optuna.study.MaxTrialsCallback(n_trials_total, states=FINISHED_STATES)],
+            gc_after_trial=True
+        )
+    finally:
+        if hasattr(objective, 'close'):
+            objective.close()
+
+
+def _spawned_worker(*args) -> None:
+    """Entrada dos processos filhos (logs do Optuna só com avisos)"""
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+    _search_worker(*args)
+
+
+def run_parallel_search(
+    objective: Callable[[optuna.Trial], float],
+    n_trials: int,
+    storage_path: Union[str, Path] = 'optuna/boston_housing.log',
+    study_name: str = 'boston_housing_optimization',
+    n_workers: int = 1,
+    threads_per_worker: Optional[int] = None,
+    seed: int = 42,
+    direction: str = 'minimize',
+    pruner_kwargs: Optional[Dict] = None
+) -> optuna.Study:
+    """
+    Busca de hiperparâmetros em N processos locais com storage compartilhado
+    
+    Todos os workers usam o mesmo estudo (TPESampler + HyperbandPruner, como
+    no notebook), cada um com seed seed + worker_id. O estudo é persistido
+    no arquivo a cada trial: se a execução for interrompida, chamar de novo
+    com os mesmos argumentos retoma a busca, executando apenas os trials que
+    faltam para chegar a n_trials (trials interrompidos são repetidos).
+    
+    O objective precisa ser serializável (função de módulo ou objeto, ex.:
+    KFoldObjective), pois os workers são iniciados com 'spawn'.
+    
+    Sem threads_per_worker, as threads intra-op e inter-op de cada worker
+    vêm de src/runtime.py: um micro-benchmark do MLP de DEFAULT_CONFIG
+    rodando em n_workers processos simultâneos (em cache por máquina),
+    aplicado em cada worker antes do primeiro trial.
+    
+    Exemplo:
+        >>> study = run_parallel_search(objective, n_trials=300, n_workers=8)
+        >>> study.best_params
+    
+    Args:
+        objective: Função objetivo do Optuna
+        n_trials: Total de trials finalizados (COMPLETE ou PRUNED) desejado
+        storage_path: Arquivo de storage ('.db' -> SQLite, senão journal)
+        study_name: Nome do estudo
+        n_workers: Número de processos
+        threads_per_worker: Threads intra-op do PyTorch por processo (padrão:
+            ajuste automático, ver abaixo)
+        seed: Seed base dos samplers
+        direction: 'minimize' ou 'maximize'
+        pruner_kwargs: Parâmetros do HyperbandPruner (padrão: os do objective,
+            se ele definir pruner_kwargs(), senão os do notebook)
+    
+    Returns:
+        optuna.Study carregado do storage, com todos os trials
+    
+    Raises:
+        RuntimeError: Se algum worker terminar com código de saída diferente de 0
+    """
+    storage_path = str(storage_path)
+    if pruner_kwargs is None and hasattr(objective, 'pruner_kwargs'):
+        pruner_kwargs = objective.pruner_kwargs()
+    study = load_or_create_study(study_name, storage_path, seed, direction, pruner_kwargs)
+    
+    n_recovered = _recover_interrupted_trials(study, getattr(objective, 'snapshot_dir', None))
+    n_finished = len(study.get_trials(deepcopy=False, states=FINISHED_STATES))
+    remaining = n_trials - n_finished
+    print(f"🔎 Estudo '{study_name}': {n_finished} trials finalizados, {remaining} restantes"
+          + (f" ({n_recovered} interrompidos re-enfileirados)" if n_recovered else ""))
+    if remaining <= 0:
+        return study
+    
+    n_workers = max(1, min(n_workers, remaining))
+    n_trials_worker = math.ceil(remaining / n_workers)
+    if threads_per_worker is not None:
+        thread_settings = {'intra_op': threads_per_worker, 'inter_op': None}
+    else:
+        # O espaço de busca varia a arquitetura; o MLP de DEFAULT_CONFIG é o representativo
+        input_dim = objective.X.shape[1] if hasattr(objective, 'X') else 13
+        thread_settings = tune_threads_for_config(
+            input_dim, DEFAULT_CONFIG, n_workers=n_workers, probe_interop=True, apply=False
+        )
+    args = (study_name, storage_path, objective, n_trials, n_trials_worker,
+            seed, direction, pruner_kwargs, thread_settings)
+    
+    if n_workers == 1:
+        previous_threads = torch.get_num_threads()
+        try:
+            _search_worker(0, *args)
+        finally:
+            torch.set_num_threads(previous_threads)
+    else:
+        context = multiprocessing.get_context('spawn')
+        processes = [
+            context.Process(target=_spawned_worker, args=(worker_id, *args))
+            for worker_id in range(n_workers)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        failed = {worker_id: process.exitcode for worker_id, process in enumerate(processes)
+                  if process.exitcode != 0}
+        if failed:
+            codes = ', '.join(f"worker {worker_id}: {code}" for worker_id, code in failed.items())
+            raise RuntimeError(
+                f"{len(failed)} de {n_workers} workers terminaram com erro ({codes}). "
+                f"Os trials já finalizados estão em {storage_path}; chame de novo para retomar."
+            )
+    
+    return optuna.load_study(study_name=study_name, storage=make_storage(storage_path))
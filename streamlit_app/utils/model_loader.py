@@ -136,6 +136,13 @@ def load_model(checkpoint_path: str = None) -> MLP:
     # Colocar em modo eval
     model.eval()
     
+    # Threads do PyTorch para predições de 1 amostra (micro-benchmark em cache por máquina)
+    try:
+        from src.runtime import tune_threads_for_model
+        tune_threads_for_model(model, batch_size=1, mode='inference')
+    except Exception as e:
+        print(f"⚠️ Ajuste de threads ignorado: {e}")
+    
     return model
 
 
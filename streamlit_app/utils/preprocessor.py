@@ -3,11 +3,17 @@ Módulo para pré-processamento de dados
 """
 
 import os
+import sys
 import numpy as np
 import torch
 from sklearn.preprocessing import StandardScaler
 import pickle
 from pathlib import Path
+from typing import Union
+
+# Adicionar src ao path para importar RunningStats
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from src.store import RunningStats
 
 
 # Valores médios e desvios padrão do Boston Housing Dataset (para normalização manual)
@@ -101,7 +107,35 @@ def load_scaler(scaler_path: str = None) -> StandardScaler:
     return None
 
 
-def preprocess_input(features: list, use_scaler: bool = False) -> torch.Tensor:
+def load_running_stats(stats_path: str = None) -> RunningStats:
+    """
+    Carrega as estatísticas online (média/desvio) exportadas pela base
+    incremental (IncrementalBostonStore.feature_stats.save).
+    
+    Args:
+        stats_path: Caminho para o arquivo .json das estatísticas
+        
+    Returns:
+        RunningStats ou None se não encontrado
+    """
+    if stats_path is None:
+        base_path = Path(__file__).parent.parent.parent
+        stats_path = base_path / "streamlit_app" / "assets" / "running_stats.json"
+    
+    try:
+        if os.path.exists(stats_path):
+            return RunningStats.load(stats_path)
+    except Exception as e:
+        print(f"⚠️ Aviso: Não foi possível carregar estatísticas: {e}")
+    
+    return None
+
+
+def preprocess_input(
+    features: list,
+    use_scaler: bool = False,
+    stats: Union[RunningStats, str, None] = None
+) -> torch.Tensor:
     """
     Pré-processa input do usuário para formato do modelo.
     
@@ -109,6 +143,9 @@ def preprocess_input(features: list, use_scaler: bool = False) -> torch.Tensor:
         features: Lista com 13 valores de features na ordem:
                   [CRIM, ZN, INDUS, CHAS, NOX, RM, AGE, DIS, RAD, TAX, PTRATIO, B, LSTAT]
         use_scaler: Se True, tenta usar StandardScaler salvo
+        stats: RunningStats (ou caminho do .json) com a média/desvio atuais da
+               base incremental; tem prioridade sobre scaler e valores fixos.
+               Se None, usa assets/running_stats.json quando existir
         
     Returns:
         Tensor PyTorch normalizado (1, 13)
@@ -120,8 +157,17 @@ def preprocess_input(features: list, use_scaler: bool = False) -> torch.Tensor:
     if features_array.shape[1] != 13:
         raise ValueError(f"Esperado 13 features, recebido {features_array.shape[1]}")
     
+    if stats is None:
+        # Estatísticas exportadas pela base incremental (None se não houver)
+        stats = load_running_stats()
+    elif isinstance(stats, (str, Path)):
+        stats = load_running_stats(stats)
+    
     # Normalizar
-    if use_scaler:
+    if stats is not None:
+        # Estatísticas online da base incremental (sem reajuste completo)
+        features_scaled = (features_array - stats.mean[:13]) / stats.std[:13]
+    elif use_scaler:
         scaler = load_scaler()
         if scaler:
             features_scaled = scaler.transform(features_array)